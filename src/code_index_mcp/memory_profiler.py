@@ -13,21 +13,97 @@ import psutil
 import tempfile
 import threading
 import pickle
+import io
+import mmap
 import json
+import shutil
+import hashlib
+import heapq
+import itertools
+import inspect
 from typing import Dict, List, Optional, Callable, Any, Tuple
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, fields
+from operator import attrgetter
 from pathlib import Path
-from collections import deque
-from threading import Lock, Event
+from collections import OrderedDict
+from threading import Lock, Condition
 import weakref
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+# Number of snapshots kept by each profiler
+MAX_SNAPSHOTS = 100
+
+# Spill staging buffers that grew beyond this are dropped instead of reused
+SPILL_BUFFER_MAX_BYTES = 8 * 1024 * 1024
+
+# A collection freeing less than this escalates the next one to an older generation
+GC_ESCALATE_MIN_FREED_MB = 5.0
+
+# Bit flags returned by MemoryProfiler.check_limits
+SOFT_LIMIT_BIT = 1 << 0
+HARD_LIMIT_BIT = 1 << 1
+GC_THRESHOLD_BIT = 1 << 2
+SPILL_THRESHOLD_BIT = 1 << 3
+MAX_LOADED_FILES_BIT = 1 << 4
+MAX_CACHED_QUERIES_BIT = 1 << 5
+CLEANUP_BITS = SOFT_LIMIT_BIT | MAX_LOADED_FILES_BIT | MAX_CACHED_QUERIES_BIT
+
+# Violation names, indexed by bit position
+VIOLATION_NAMES = (
+    'soft_limit',
+    'hard_limit',
+    'gc_threshold',
+    'spill_threshold',
+    'max_loaded_files',
+    'max_cached_queries',
+)
+
+
+class _GCTimer:
+    """Accumulates time spent in the garbage collector via ``gc.callbacks``."""
+    
+    _installed = False
+    _install_lock = Lock()
+    _started = 0.0
+    total_seconds = 0.0
+    
+    @classmethod
+    def install(cls):
+        """Register the process-wide GC callback once."""
+        with cls._install_lock:
+            if not cls._installed:
+                gc.callbacks.append(cls._callback)
+                cls._installed = True
+    
+    @classmethod
+    def _callback(cls, phase: str, info: Dict[str, Any]):
+        if phase == 'start':
+            cls._started = time.perf_counter()
+        else:
+            cls.total_seconds += time.perf_counter() - cls._started
+
+
+def _callback_ref(callback: Callable) -> Callable[[], Optional[Callable]]:
+    """Wrap a callback so bound methods do not keep their owner alive."""
+    if inspect.ismethod(callback):
+        return weakref.WeakMethod(callback)
+    return lambda: callback
+
+
+def violations_to_dict(flags: int) -> Dict[str, bool]:
+    """Expand packed violation flags into a name -> bool mapping."""
+    return {name: bool(flags >> bit & 1) for bit, name in enumerate(VIOLATION_NAMES)}
+
+
+@dataclass(slots=True, frozen=True)
 class MemorySnapshot:
     """Represents a memory usage snapshot at a point in time."""
     timestamp: float
@@ -41,7 +117,16 @@ class MemorySnapshot:
     cached_queries: int
 
 
-@dataclass
+_SNAPSHOT_FIELDS = tuple(f.name for f in fields(MemorySnapshot))
+_snapshot_values = attrgetter(*_SNAPSHOT_FIELDS)
+
+
+def _snapshot_to_dict(snapshot: MemorySnapshot) -> Dict[str, Any]:
+    """Flat dict of a snapshot; avoids the recursive copying done by ``asdict``."""
+    return dict(zip(_SNAPSHOT_FIELDS, _snapshot_values(snapshot)))
+
+
+@dataclass(slots=True)
 class MemoryLimits:
     """Memory limits configuration."""
     soft_limit_mb: float = 512.0  # 512MB soft limit
@@ -50,6 +135,72 @@ class MemoryLimits:
     max_cached_queries: int = 50
     gc_threshold_mb: float = 256.0  # Trigger GC at 256MB
     spill_threshold_mb: float = 768.0  # Spill to disk at 768MB
+    max_spilled_items: int = 1024  # Spilled keys tracked before the oldest is dropped
+
+
+class _GlobalMonitor:
+    """Single daemon thread that drives the monitoring loop of every profiler.
+    
+    Profilers are kept in a heap of ``(next_run, token, weakref, interval)``
+    entries, so the thread never keeps a profiler alive and an entry is simply
+    discarded once its profiler stops monitoring or is collected.
+    """
+    
+    _instance: Optional['_GlobalMonitor'] = None
+    _instance_lock = Lock()
+    
+    def __init__(self):
+        self._heap: List[Tuple[float, int, weakref.ref, float]] = []
+        self._condition = Condition()
+        self._tokens = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+    
+    @classmethod
+    def get(cls) -> '_GlobalMonitor':
+        """Return the process-wide monitor, creating it on first use."""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+    
+    def schedule(self, profiler: 'MemoryProfiler', interval: float) -> int:
+        """Schedule periodic ticks for a profiler and return its token."""
+        with self._condition:
+            token = next(self._tokens)
+            heapq.heappush(self._heap, (time.monotonic() + interval, token, weakref.ref(profiler), interval))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="memory-monitor", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+            return token
+    
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    if not self._heap:
+                        # Nothing left to monitor; let the thread exit
+                        self._thread = None
+                        return
+                    next_run, token, ref, interval = self._heap[0]
+                    profiler = ref()
+                    if profiler is None or profiler._monitor_token != token:
+                        heapq.heappop(self._heap)
+                        continue
+                    delay = next_run - time.monotonic()
+                    if delay <= 0:
+                        heapq.heapreplace(self._heap, (next_run + interval, token, ref, interval))
+                        break
+                    del profiler
+                    self._condition.wait(delay)
+            
+            try:
+                profiler._tick()
+            except Exception as e:
+                logger.error("Error in memory monitoring: %s", e)
+            finally:
+                del profiler
 
 
 class MemoryProfiler:
@@ -57,24 +208,33 @@ class MemoryProfiler:
     
     def __init__(self, limits: Optional[MemoryLimits] = None):
         self.limits = limits or MemoryLimits()
-        self.snapshots: deque = deque(maxlen=100)  # Keep last 100 snapshots
+        # Last 100 snapshots as an immutable tuple; replaced wholesale on each
+        # snapshot so readers never need a lock
+        self._snapshots_view: Tuple[MemorySnapshot, ...] = ()
         self.peak_memory_mb = 0.0
         self.start_time = time.time()
         self.process = psutil.Process()
-        self._lock = Lock()
+        self._lock = Lock()  # Guards spilled_data
         self._monitoring = False
-        self._monitor_thread = None
-        self._shutdown_event = Event()
+        self._monitor_token: Optional[int] = None
+        
+        # Callbacks for memory events, stored as references (see _callback_ref)
+        self.cleanup_callbacks: List[Callable[[], Optional[Callable]]] = []
+        self.spill_callbacks: List[Callable[[], Optional[Callable]]] = []
+        self.limit_exceeded_callbacks: List[Callable[[], Optional[Callable]]] = []
         
-        # Callbacks for memory events
-        self.cleanup_callbacks: List[Callable] = []
-        self.spill_callbacks: List[Callable] = []
-        self.limit_exceeded_callbacks: List[Callable] = []
+        # Spill storage (private per-profiler directory so bulk cleanup is safe)
+        spill_root = Path(tempfile.gettempdir()) / "code_index_mcp_spill"
+        spill_root.mkdir(exist_ok=True)
+        self.spill_dir = Path(tempfile.mkdtemp(prefix=f"{os.getpid()}_", dir=spill_root))
+        self.spilled_data: 'OrderedDict[str, str]' = OrderedDict()  # key -> file_path, oldest first
+        self._spill_buffer = io.BytesIO()  # Reused pickling buffer
+        self._spill_buffer_lock = Lock()
         
-        # Spill storage
-        self.spill_dir = Path(tempfile.gettempdir()) / "code_index_mcp_spill"
-        self.spill_dir.mkdir(exist_ok=True)
-        self.spilled_data: Dict[str, str] = {}  # key -> file_path mapping
+        # Generation used for the next limit-triggered collection; escalates
+        # when young-generation collections stop freeing memory
+        self._gc_phase = 0
+        _GCTimer.install()
         
         # Initialize baseline memory usage
         self._baseline_memory = self._get_memory_usage()
@@ -87,16 +247,20 @@ class MemoryProfiler:
         except (psutil.NoSuchProcess, psutil.AccessDenied):
             return 0.0
     
-    def _get_heap_size(self) -> float:
-        """Estimate heap size in MB."""
+    def _sample_heap(self) -> Tuple[float, int]:
+        """Estimate heap size in MB and count GC-tracked objects in one pass."""
         try:
             # Get object count and estimate size
             objects = gc.get_objects()
             total_size = sum(sys.getsizeof(obj) for obj in objects[:1000])  # Sample first 1000
             estimated_total = (total_size / 1000) * len(objects)
-            return estimated_total / 1024 / 1024  # Convert to MB
+            return estimated_total / 1024 / 1024, len(objects)  # Convert to MB
         except Exception:
-            return 0.0
+            return 0.0, 0
+    
+    def _get_heap_size(self) -> float:
+        """Estimate heap size in MB."""
+        return self._sample_heap()[0]
     
     def _get_gc_stats(self) -> Tuple[int, int, int]:
         """Get garbage collection statistics."""
@@ -110,48 +274,64 @@ class MemoryProfiler:
         except Exception:
             return (0, 0, 0)
     
-    def take_snapshot(self, loaded_files: int = 0, cached_queries: int = 0) -> MemorySnapshot:
-        """Take a memory snapshot."""
+    @property
+    def snapshots(self) -> Tuple[MemorySnapshot, ...]:
+        """Recorded snapshots, oldest first."""
+        return self._snapshots_view
+    
+    def _build_snapshot(self, loaded_files: int = 0, cached_queries: int = 0) -> MemorySnapshot:
+        """Sample memory once and build a snapshot without recording it."""
         current_memory = self._get_memory_usage()
-        heap_size = self._get_heap_size()
+        heap_size, gc_objects = self._sample_heap()
         
         # Update peak memory
         if current_memory > self.peak_memory_mb:
             self.peak_memory_mb = current_memory
         
-        snapshot = MemorySnapshot(
+        return MemorySnapshot(
             timestamp=time.time(),
             process_memory_mb=current_memory,
             heap_size_mb=heap_size,
             peak_memory_mb=self.peak_memory_mb,
-            gc_objects=len(gc.get_objects()),
+            gc_objects=gc_objects,
             gc_collections=self._get_gc_stats(),
             active_threads=threading.active_count(),
             loaded_files=loaded_files,
             cached_queries=cached_queries
         )
+    
+    def take_snapshot(self, loaded_files: int = 0, cached_queries: int = 0) -> MemorySnapshot:
+        """Take a memory snapshot."""
+        snapshot = self._build_snapshot(loaded_files, cached_queries)
         
-        with self._lock:
-            self.snapshots.append(snapshot)
+        # Single reference assignment, atomic under the GIL
+        self._snapshots_view = (*self._snapshots_view[-(MAX_SNAPSHOTS - 1):], snapshot)
         
         return snapshot
     
-    def check_limits(self, snapshot: MemorySnapshot) -> Dict[str, bool]:
-        """Check if memory limits are exceeded."""
-        violations = {
-            'soft_limit': snapshot.process_memory_mb > self.limits.soft_limit_mb,
-            'hard_limit': snapshot.process_memory_mb > self.limits.hard_limit_mb,
-            'gc_threshold': snapshot.process_memory_mb > self.limits.gc_threshold_mb,
-            'spill_threshold': snapshot.process_memory_mb > self.limits.spill_threshold_mb,
-            'max_loaded_files': snapshot.loaded_files > self.limits.max_loaded_files,
-            'max_cached_queries': snapshot.cached_queries > self.limits.max_cached_queries
-        }
+    def check_limits(self, snapshot: MemorySnapshot) -> int:
+        """Check if memory limits are exceeded.
         
-        return violations
+        Returns the violations packed into an int of ``*_BIT`` flags; use
+        ``violations_to_dict`` for a readable mapping.
+        """
+        limits = self.limits
+        memory = snapshot.process_memory_mb
+        return (
+            (memory > limits.soft_limit_mb)
+            | (memory > limits.hard_limit_mb) << 1
+            | (memory > limits.gc_threshold_mb) << 2
+            | (memory > limits.spill_threshold_mb) << 3
+            | (snapshot.loaded_files > limits.max_loaded_files) << 4
+            | (snapshot.cached_queries > limits.max_cached_queries) << 5
+        )
     
     def enforce_limits(self, snapshot: MemorySnapshot) -> Dict[str, Any]:
         """Enforce memory limits and trigger appropriate actions."""
-        violations = self.check_limits(snapshot)
+        return self._act_on_violations(self.check_limits(snapshot), snapshot.process_memory_mb)
+    
+    def _act_on_violations(self, violations: int, memory_mb: float) -> Dict[str, Any]:
+        """Run the actions selected by packed violation flags."""
         actions_taken = {
             'garbage_collection': False,
             'cleanup_triggered': False,
@@ -159,97 +339,175 @@ class MemoryProfiler:
             'limit_exceeded': False
         }
         
+        log_info = logger.isEnabledFor(logging.INFO)
+        
         # Trigger garbage collection
-        if violations['gc_threshold']:
-            logger.info(f"Triggering garbage collection at {snapshot.process_memory_mb:.2f}MB")
-            collected = gc.collect()
+        if violations & GC_THRESHOLD_BIT:
+            generation = self._gc_phase
+            if log_info:
+                logger.info("Triggering generation %d garbage collection at %.2fMB", generation, memory_mb)
+            collected = gc.collect(generation)
+            freed_mb = memory_mb - self._get_memory_usage()
+            if freed_mb < GC_ESCALATE_MIN_FREED_MB:
+                self._gc_phase = min(generation + 1, 2)
+            elif generation > 0:
+                self._gc_phase = generation - 1
             actions_taken['garbage_collection'] = True
-            logger.info(f"Garbage collection freed {collected} objects")
+            if log_info:
+                logger.info("Garbage collection freed %d objects (%.2fMB)", collected, freed_mb)
         
         # Trigger cleanup
-        if violations['soft_limit'] or violations['max_loaded_files'] or violations['max_cached_queries']:
-            logger.info(f"Triggering cleanup at {snapshot.process_memory_mb:.2f}MB")
+        if violations & CLEANUP_BITS:
+            if log_info:
+                logger.info("Triggering cleanup at %.2fMB", memory_mb)
             self._trigger_cleanup()
             actions_taken['cleanup_triggered'] = True
         
         # Trigger spill to disk
-        if violations['spill_threshold']:
-            logger.info(f"Triggering spill to disk at {snapshot.process_memory_mb:.2f}MB")
+        if violations & SPILL_THRESHOLD_BIT:
+            if log_info:
+                logger.info("Triggering spill to disk at %.2fMB", memory_mb)
             self._trigger_spill()
             actions_taken['spill_triggered'] = True
         
         # Hard limit exceeded
-        if violations['hard_limit']:
-            logger.warning(f"Hard memory limit exceeded: {snapshot.process_memory_mb:.2f}MB")
+        if violations & HARD_LIMIT_BIT:
+            logger.warning("Hard memory limit exceeded: %.2fMB", memory_mb)
             self._trigger_limit_exceeded()
             actions_taken['limit_exceeded'] = True
         
         return actions_taken
     
-    def _trigger_cleanup(self):
-        """Trigger cleanup callbacks."""
-        for callback in self.cleanup_callbacks:
+    def _fire(self, callback_refs: List[Callable[[], Optional[Callable]]], event: str):
+        """Invoke live callbacks and drop the ones whose owner was collected."""
+        dead = False
+        for ref in callback_refs:
+            callback = ref()
+            if callback is None:
+                dead = True
+                continue
             try:
                 callback()
             except Exception as e:
-                logger.error(f"Error in cleanup callback: {e}")
+                logger.error("Error in %s callback: %s", event, e)
+        if dead:
+            callback_refs[:] = [ref for ref in callback_refs if ref() is not None]
+    
+    def _trigger_cleanup(self):
+        """Trigger cleanup callbacks."""
+        self._fire(self.cleanup_callbacks, "cleanup")
     
     def _trigger_spill(self):
         """Trigger spill to disk callbacks."""
-        for callback in self.spill_callbacks:
-            try:
-                callback()
-            except Exception as e:
-                logger.error(f"Error in spill callback: {e}")
+        self._fire(self.spill_callbacks, "spill")
     
     def _trigger_limit_exceeded(self):
         """Trigger limit exceeded callbacks."""
-        for callback in self.limit_exceeded_callbacks:
-            try:
-                callback()
-            except Exception as e:
-                logger.error(f"Error in limit exceeded callback: {e}")
+        self._fire(self.limit_exceeded_callbacks, "limit exceeded")
     
     def spill_to_disk(self, key: str, data: Any) -> bool:
-        """Spill data to disk and return success status."""
+        """Spill data to disk and return success status.
+        
+        Spill files are named after a hash of their content, so spilling
+        identical data twice only writes it once. Bytes-like payloads are
+        written raw rather than pickled.
+        """
         try:
-            spill_file = self.spill_dir / f"{key}.pkl"
-            with open(spill_file, 'wb') as f:
-                pickle.dump(data, f)
-            self.spilled_data[key] = str(spill_file)
-            logger.info(f"Spilled data for key '{key}' to {spill_file}")
+            if isinstance(data, (bytes, bytearray, memoryview)):
+                spill_file = self._write_spill_payload(data, "bin")
+            else:
+                with self._spill_buffer_lock:
+                    buffer = self._spill_buffer
+                    buffer.seek(0)
+                    pickle.Pickler(buffer, protocol=5).dump(data)
+                    size = buffer.tell()
+                    with buffer.getbuffer() as view:
+                        spill_file = self._write_spill_payload(view[:size], "pkl")
+                    if size > SPILL_BUFFER_MAX_BYTES:
+                        self._spill_buffer = io.BytesIO()
+            
+            with self._lock:
+                previous = self.spilled_data.get(key)
+                self.spilled_data[key] = str(spill_file)
+                self.spilled_data.move_to_end(key)
+                if previous is not None and previous != str(spill_file):
+                    self._discard_spill_file(previous)
+                while len(self.spilled_data) > self.limits.max_spilled_items:
+                    _, evicted = self.spilled_data.popitem(last=False)
+                    self._discard_spill_file(evicted)
+            
+            logger.info("Spilled data for key '%s' to %s", key, spill_file)
             return True
         except Exception as e:
-            logger.error(f"Failed to spill data for key '{key}': {e}")
+            logger.error("Failed to spill data for key '%s': %s", key, e)
             return False
     
+    def _write_spill_payload(self, payload, suffix: str) -> Path:
+        """Write a payload under its content hash unless it is already on disk."""
+        digest = hashlib.blake2b(payload, digest_size=16).hexdigest()
+        spill_file = self.spill_dir / f"{digest}.{suffix}"
+        if not spill_file.exists():
+            tmp_file = self.spill_dir / f"{digest}.{threading.get_ident()}.tmp"
+            fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            try:
+                with memoryview(payload) as remaining:
+                    while remaining:
+                        remaining = remaining[os.write(fd, remaining):]
+            finally:
+                os.close(fd)
+            # Atomic rename; durability is not required for spill data, so no fsync
+            os.replace(tmp_file, spill_file)
+        return spill_file
+    
+    def _discard_spill_file(self, file_path: str):
+        """Remove a spill file unless another key still refers to it.
+        
+        Must be called with ``self._lock`` held.
+        """
+        if file_path not in self.spilled_data.values():
+            Path(file_path).unlink(missing_ok=True)
+    
     def load_from_disk(self, key: str) -> Optional[Any]:
         """Load spilled data from disk."""
-        if key not in self.spilled_data:
+        file_path = self.spilled_data.get(key)
+        if file_path is None:
             return None
         
         try:
-            spill_file = Path(self.spilled_data[key])
+            spill_file = Path(file_path)
             if not spill_file.exists():
-                del self.spilled_data[key]
+                with self._lock:
+                    self.spilled_data.pop(key, None)
                 return None
             
+            # Decode straight from the page cache instead of reading the file
+            # into an intermediate buffer; reloads happen under memory pressure
             with open(spill_file, 'rb') as f:
-                data = pickle.load(f)
-            logger.info(f"Loaded spilled data for key '{key}' from {spill_file}")
+                if os.fstat(f.fileno()).st_size == 0:
+                    data = b''
+                else:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        data = mm[:] if spill_file.suffix == '.bin' else pickle.loads(mm)
+            logger.info("Loaded spilled data for key '%s' from %s", key, spill_file)
             return data
         except Exception as e:
-            logger.error(f"Failed to load spilled data for key '{key}': {e}")
+            logger.error("Failed to load spilled data for key '%s': %s", key, e)
             return None
     
     def cleanup_spill_files(self):
-        """Clean up spilled files."""
-        for key, file_path in list(self.spilled_data.items()):
-            try:
-                Path(file_path).unlink(missing_ok=True)
-                del self.spilled_data[key]
-            except Exception as e:
-                logger.error(f"Failed to cleanup spill file {file_path}: {e}")
+        """Clean up spilled files, keeping the spill directory for reuse."""
+        self._remove_spill_dir()
+        try:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+        except Exception as e:
+            logger.error("Failed to recreate spill directory %s: %s", self.spill_dir, e)
+    
+    def _remove_spill_dir(self):
+        """Delete the spill directory and everything in it."""
+        # One tree removal instead of an unlink per spilled key
+        shutil.rmtree(self.spill_dir, ignore_errors=True)
+        with self._lock:
+            self.spilled_data.clear()
     
     def start_monitoring(self, interval: float = 30.0):
         """Start continuous memory monitoring."""
@@ -257,87 +515,99 @@ class MemoryProfiler:
             return
         
         self._monitoring = True
-        self._shutdown_event.clear()
-        
-        def monitor_loop():
-            while not self._shutdown_event.wait(interval):
-                try:
-                    snapshot = self.take_snapshot()
-                    self.enforce_limits(snapshot)
-                except Exception as e:
-                    logger.error(f"Error in memory monitoring: {e}")
+        self._monitor_token = _GlobalMonitor.get().schedule(self, interval)
+        logger.info("Started memory monitoring with %ss interval", interval)
+    
+    def _tick(self):
+        """Run one monitoring iteration; called from the shared monitor thread.
         
-        self._monitor_thread = threading.Thread(target=monitor_loop, daemon=True)
-        self._monitor_thread.start()
-        logger.info(f"Started memory monitoring with {interval}s interval")
+        Samples, records and checks in one pass, and only builds the actions
+        bookkeeping when a limit is actually violated.
+        """
+        snapshot = self.take_snapshot()
+        violations = self.check_limits(snapshot)
+        if violations:
+            self._act_on_violations(violations, snapshot.process_memory_mb)
     
     def stop_monitoring(self):
         """Stop continuous memory monitoring."""
         if not self._monitoring:
             return
         
+        # The shared monitor drops our schedule entry once the token no longer matches
         self._monitoring = False
-        self._shutdown_event.set()
-        if self._monitor_thread:
-            self._monitor_thread.join(timeout=5.0)
+        self._monitor_token = None
         logger.info("Stopped memory monitoring")
     
     def get_stats(self) -> Dict[str, Any]:
         """Get comprehensive memory statistics."""
-        current_memory = self._get_memory_usage()
-        heap_size = self._get_heap_size()
+        # Sample once; the snapshot is only used for the violation check and is
+        # not appended to the history
+        snapshot = self._build_snapshot()
+        current_memory = snapshot.process_memory_mb
         
-        with self._lock:
-            recent_snapshots = list(self.snapshots)[-10:]  # Last 10 snapshots
+        snapshots = self._snapshots_view
+        recent_snapshots = snapshots[-10:]  # Last 10 snapshots
         
         return {
             'current_memory_mb': current_memory,
             'peak_memory_mb': self.peak_memory_mb,
-            'heap_size_mb': heap_size,
+            'heap_size_mb': snapshot.heap_size_mb,
             'baseline_memory_mb': self._baseline_memory,
             'memory_growth_mb': current_memory - self._baseline_memory,
             'limits': asdict(self.limits),
-            'violations': self.check_limits(self.take_snapshot()),
+            'violations': violations_to_dict(self.check_limits(snapshot)),
             'monitoring_active': self._monitoring,
-            'snapshots_count': len(self.snapshots),
-            'recent_snapshots': [asdict(s) for s in recent_snapshots],
+            'snapshots_count': len(snapshots),
+            'recent_snapshots': [_snapshot_to_dict(s) for s in recent_snapshots],
             'spilled_items': len(self.spilled_data),
             'spill_directory': str(self.spill_dir),
             'gc_stats': self._get_gc_stats(),
+            'gc_time_seconds': _GCTimer.total_seconds,
+            'gc_generation': self._gc_phase,
             'uptime_seconds': time.time() - self.start_time
         }
     
     def register_cleanup_callback(self, callback: Callable):
-        """Register a callback to be called when cleanup is needed."""
-        self.cleanup_callbacks.append(callback)
+        """Register a callback to be called when cleanup is needed.
+        
+        Bound methods are held weakly, so registering does not keep their
+        owner alive.
+        """
+        self.cleanup_callbacks.append(_callback_ref(callback))
     
     def register_spill_callback(self, callback: Callable):
         """Register a callback to be called when spill is needed."""
-        self.spill_callbacks.append(callback)
+        self.spill_callbacks.append(_callback_ref(callback))
     
     def register_limit_exceeded_callback(self, callback: Callable):
         """Register a callback to be called when hard limits are exceeded."""
-        self.limit_exceeded_callbacks.append(callback)
+        self.limit_exceeded_callbacks.append(_callback_ref(callback))
     
     def export_profile(self, file_path: str):
         """Export memory profile to a file."""
         try:
             profile_data = {
                 'stats': self.get_stats(),
-                'all_snapshots': [asdict(s) for s in self.snapshots]
+                'all_snapshots': [_snapshot_to_dict(s) for s in self._snapshots_view]
             }
             
-            with open(file_path, 'w') as f:
-                json.dump(profile_data, f, indent=2)
+            if orjson is not None:
+                with open(file_path, 'wb') as f:
+                    f.write(orjson.dumps(profile_data, option=orjson.OPT_INDENT_2))
+            else:
+                with open(file_path, 'w') as f:
+                    json.dump(profile_data, f, separators=(',', ':'))
             
-            logger.info(f"Memory profile exported to {file_path}")
+            logger.info("Memory profile exported to %s", file_path)
         except Exception as e:
-            logger.error(f"Failed to export memory profile: {e}")
+            logger.error("Failed to export memory profile: %s", e)
     
     def __del__(self):
         """Cleanup on destruction."""
         self.stop_monitoring()
-        self.cleanup_spill_files()
+        # The profiler is going away, so don't leave an empty directory behind
+        self._remove_spill_dir()
 
 
 class MemoryAwareManager:
@@ -345,6 +615,8 @@ class MemoryAwareManager:
     
     def __init__(self, profiler: MemoryProfiler):
         self.profiler = profiler
+        # Bound methods are held weakly by the profiler, so this manager can
+        # still be collected while the profiler lives on
         self.profiler.register_cleanup_callback(self.cleanup)
         self.profiler.register_spill_callback(self.spill_to_disk)
         self.profiler.register_limit_exceeded_callback(self.handle_limit_exceeded)
@@ -401,20 +673,26 @@ class MemoryAwareLazyContentManager(MemoryAwareManager):
         # Get memory stats after cleanup
         stats_after = self.lazy_content_manager.get_memory_stats()
         
-        logger.info(f"Cleanup completed: {stats_before['loaded_files']} -> {stats_after['loaded_files']} loaded files")
+        logger.info("Cleanup completed: %d -> %d loaded files", stats_before['loaded_files'], stats_after['loaded_files'])
     
     def spill_to_disk(self):
         """Spill cached query results to disk."""
         with self._spill_lock:
             logger.info("Spilling query cache to disk")
             
-            # Spill query cache to disk
-            cache_items = list(self.lazy_content_manager.query_cache.cache.items())
+            # Request threads reorder and evict entries without a lock, so
+            # pickle a snapshot rather than the live OrderedDict
+            cache = self.lazy_content_manager.query_cache.cache
+            cache_items = list(cache.items())
             if cache_items:
-                spill_key = f"query_cache_{int(time.time())}"
+                spill_key = f"query_cache_{time.time_ns()}"
                 if self.profiler.spill_to_disk(spill_key, cache_items):
-                    self.lazy_content_manager.query_cache.cache.clear()
-                    logger.info(f"Spilled {len(cache_items)} query cache items to disk")
+                    # Drop only what was spilled; entries added or replaced
+                    # since the snapshot stay in memory
+                    for key, value in cache_items:
+                        if cache.get(key) is value:
+                            cache.pop(key, None)
+                    logger.info("Spilled %d query cache items to disk", len(cache_items))
     
     def handle_limit_exceeded(self):
         """Handle hard memory limit exceeded."""
@@ -442,5 +720,6 @@ def create_memory_config_from_yaml(config_data: Dict[str, Any]) -> MemoryLimits:
         max_loaded_files=memory_config.get('max_loaded_files', 100),
         max_cached_queries=memory_config.get('max_cached_queries', 50),
         gc_threshold_mb=memory_config.get('gc_threshold_mb', 256.0),
-        spill_threshold_mb=memory_config.get('spill_threshold_mb', 768.0)
+        spill_threshold_mb=memory_config.get('spill_threshold_mb', 768.0),
+        max_spilled_items=memory_config.get('max_spilled_items', 1024)
     )
@@ -6,18 +6,31 @@ storage backends for better performance and memory efficiency.
 """
 
 import os
+import copy
+import logging
 import json
+import mmap
 import shutil
 import tempfile
-import hashlib
+import re
+import zlib
+import functools
+import time
+import weakref
 from datetime import datetime
-from typing import Dict, Any, Optional, List, Tuple, Union
+from typing import Dict, Any, Optional, List, Tuple, Union, Mapping
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from .constants import (
     SETTINGS_DIR, CONFIG_FILE, INDEX_FILE, CACHE_FILE, METADATA_FILE
 )
-from .storage import SQLiteStorage, SQLiteFileIndex, TrieFileIndex
+from .storage import SQLiteStorage, SQLiteFileIndex, TrieFileIndex, open_shared_connection
+from .storage.trie_index import TRIE_MAGIC
 from .search.base import SearchStrategy
 from .search.zoekt import ZoektStrategy
 from .search.ugrep import UgrepStrategy
@@ -26,6 +39,11 @@ from .search.ag import AgStrategy
 from .search.grep import GrepStrategy
 from .search.basic import BasicSearchStrategy
 
+logger = logging.getLogger(__name__)
+
+
+# SQLite database files plus their WAL-mode sidecars
+_DB_SUFFIXES = ('.db', '.db-wal', '.db-shm')
 
 # Prioritized list of search strategies (highest priority first)
 SEARCH_STRATEGY_CLASSES = [
@@ -38,10 +56,14 @@ SEARCH_STRATEGY_CLASSES = [
 ]
 
 
-def _get_available_strategies() -> List[SearchStrategy]:
+@functools.lru_cache(maxsize=4)
+def _probe_strategies(path_hash: int) -> Tuple[SearchStrategy, ...]:
     """
-    Detect and return a list of available search strategy instances,
-    ordered by preference.
+    Detect the available search strategies, ordered by preference.
+    
+    Probing looks up (and for some tools runs) external binaries, so the
+    result is cached per process; path_hash is the hash of $PATH and only
+    serves as the cache key, so changing PATH triggers a fresh probe.
     """
     available = []
     for strategy_class in SEARCH_STRATEGY_CLASSES:
@@ -50,13 +72,40 @@ def _get_available_strategies() -> List[SearchStrategy]:
             if strategy.is_available():
                 available.append(strategy)
         except Exception as e:
-            print(f"Error initializing strategy {strategy_class.__name__}: {e}")
-    return available
+            logger.error("Error initializing strategy %s: %s", strategy_class.__name__, e)
+    return tuple(available)
+
+
+def _get_available_strategies() -> List[SearchStrategy]:
+    """
+    Return fresh instances of the available search strategies, ordered by
+    preference.
+    
+    The probed instances are copied so that per-project state (such as
+    Zoekt's index flag) is never shared between settings objects.
+    """
+    return [copy.copy(strategy) for strategy in _probe_strategies(hash(os.environ.get('PATH', '')))]
+
+
+@functools.lru_cache(maxsize=64)
+def _project_hash(base_path: str) -> str:
+    """Return the settings directory name for a project path.
+    
+    The project's own directory name keeps entries recognisable; a 64-bit
+    suffix (CRC-32 plus Adler-32 of the full path) tells apart projects
+    that share a name.
+    """
+    encoded = base_path.encode('utf-8', 'surrogateescape')
+    name = re.sub(r'[^A-Za-z0-9._-]', '_', os.path.basename(os.path.normpath(base_path)))[:64]
+    return f"{name or 'root'}_{zlib.crc32(encoded):08x}{zlib.adler32(encoded):08x}"
 
 
 class OptimizedProjectSettings:
     """Enhanced project settings with configurable storage backends."""
     
+    # (epoch second, its local ISO-8601 text) for _get_timestamp
+    _timestamp_prefix: Tuple[int, str] = (-1, '')
+    
     def __init__(self, base_path: str, skip_load: bool = False, 
                  storage_backend: str = 'sqlite', use_trie_index: bool = False):
         """Initialize optimized project settings.
@@ -72,62 +121,80 @@ class OptimizedProjectSettings:
         self.storage_backend = storage_backend
         self.use_trie_index = use_trie_index
         self.available_strategies: List[SearchStrategy] = []
+        # Parsed config keyed by the (st_mtime_ns, st_size) it was read at
+        self._config_cache: Optional[Tuple[Tuple[int, int], Dict[str, Any]]] = None
+        # Connection shared by the cache and metadata tables in store.db, and
+        # the finalizer that closes it if the instance is collected or the
+        # interpreter exits without close() being called
+        self._conn = None
+        self._conn_finalizer: Optional[weakref.finalize] = None
         
         # Initialize storage backend
         self._init_storage_backend()
         
-        # Initialize search strategies
-        self.refresh_available_strategies()
+        # Initialize search strategies (probed once per process and PATH)
+        self.available_strategies = _get_available_strategies()
     
     def _init_storage_backend(self):
         """Initialize the storage backend."""
         try:
             # Get system temporary directory
             system_temp = tempfile.gettempdir()
-            print(f"System temporary directory: {system_temp}")
+            logger.debug("System temporary directory: %s", system_temp)
 
-            # Create code_indexer directory
+            # code_indexer directory; created below along with settings_path
             temp_base_dir = os.path.join(system_temp, SETTINGS_DIR)
-            if not os.path.exists(temp_base_dir):
-                os.makedirs(temp_base_dir, exist_ok=True)
             
             # Use hash of project path as unique identifier
             if self.base_path:
-                path_hash = hashlib.md5(self.base_path.encode()).hexdigest()
+                path_hash = _project_hash(self.base_path)
                 self.settings_path = os.path.join(temp_base_dir, path_hash)
             else:
                 self.settings_path = os.path.join(temp_base_dir, "default")
             
-            # Ensure settings directory exists
+            # Ensure settings directory (and code_indexer parent) exists
             os.makedirs(self.settings_path, exist_ok=True)
             
+            # These only depend on settings_path, so join them once
+            self._config_path = os.path.join(self.settings_path, CONFIG_FILE)
+            self._index_path = os.path.join(self.settings_path, INDEX_FILE)
+            self._cache_path = os.path.join(self.settings_path, CACHE_FILE)
+            self._metadata_path = os.path.join(self.settings_path, METADATA_FILE)
+            
             # Initialize storage backends
             if self.storage_backend == 'sqlite':
+                # One database file holds every table, so there is a single
+                # WAL to sync; cache and metadata also share each thread's
+                # connection and page cache.
+                store_db_path = os.path.join(self.settings_path, "store.db")
+                self._conn = open_shared_connection(store_db_path)
+                self._conn_finalizer = weakref.finalize(self, self._conn.close)
+                
                 # SQLite storage for cache and config
-                cache_db_path = os.path.join(self.settings_path, "cache.db")
-                self.cache_storage = SQLiteStorage(cache_db_path, enable_fts=True)
+                self.cache_storage = SQLiteStorage(store_db_path, enable_fts=True,
+                                                   table='cache_kv', connection=self._conn)
                 
                 # File index storage
                 if self.use_trie_index:
                     self.file_index = TrieFileIndex()
                 else:
-                    index_db_path = os.path.join(self.settings_path, "index.db")
-                    self.file_index = SQLiteFileIndex(index_db_path)
+                    self.file_index = SQLiteFileIndex(store_db_path)
                 
                 # Metadata storage
-                metadata_db_path = os.path.join(self.settings_path, "metadata.db")
-                self.metadata_storage = SQLiteStorage(metadata_db_path, enable_fts=False)
+                self.metadata_storage = SQLiteStorage(store_db_path, enable_fts=False,
+                                                      table='metadata_kv', connection=self._conn)
                 
-                print(f"Initialized SQLite storage backend at: {self.settings_path}")
+                logger.debug("Initialized SQLite storage backend at: %s", self.settings_path)
             else:
                 # Fallback to memory-based storage (for backward compatibility)
                 self.cache_storage = {}
                 self.file_index = {}
                 self.metadata_storage = {}
-                print(f"Using memory-based storage backend")
+                logger.debug("Using memory-based storage backend")
                 
         except Exception as e:
-            print(f"Error initializing storage backend: {e}")
+            logger.error("Error initializing storage backend: %s", e)
+            self._close_connection()
             # Fallback to memory-based storage
             self.cache_storage = {}
             self.file_index = {}
@@ -135,23 +202,30 @@ class OptimizedProjectSettings:
     
     def get_config_path(self) -> str:
         """Get the path to the configuration file."""
-        return os.path.join(self.settings_path, CONFIG_FILE)
+        return self._config_path
     
     def get_index_path(self) -> str:
         """Get the path to the index file."""
-        return os.path.join(self.settings_path, INDEX_FILE)
+        return self._index_path
     
     def get_cache_path(self) -> str:
         """Get the path to the cache file."""
-        return os.path.join(self.settings_path, CACHE_FILE)
+        return self._cache_path
     
     def get_metadata_path(self) -> str:
         """Get the path to the metadata file."""
-        return os.path.join(self.settings_path, METADATA_FILE)
+        return self._metadata_path
     
     def _get_timestamp(self) -> str:
-        """Get current timestamp."""
-        return datetime.now().isoformat()
+        """Get current timestamp (local time, ISO 8601 with microseconds)."""
+        now = time.time()
+        second = int(now)
+        cached_second, prefix = OptimizedProjectSettings._timestamp_prefix
+        if second != cached_second:
+            # Only the date/time part needs datetime; reuse it within the second
+            prefix = datetime.fromtimestamp(second).isoformat()
+            OptimizedProjectSettings._timestamp_prefix = (second, prefix)
+        return f"{prefix}.{int((now - second) * 1e6):06d}"
     
     def save_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
         """Save configuration data."""
@@ -159,15 +233,31 @@ class OptimizedProjectSettings:
             config_path = self.get_config_path()
             config['last_updated'] = self._get_timestamp()
             
-            os.makedirs(os.path.dirname(config_path), exist_ok=True)
+            if orjson is not None:
+                data = orjson.dumps(config, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            else:
+                data = json.dumps(config, indent=2, ensure_ascii=False).encode('utf-8')
             
-            with open(config_path, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
+            # Write a temp file in the same directory and rename it over the
+            # config, so readers never see a partially written file. The
+            # settings directory is created in _init_storage_backend.
+            tmp_path = f"{config_path}.tmp.{os.getpid()}"
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd, view):]
+                os.fsync(fd)
+                st = os.fstat(fd)
+            finally:
+                os.close(fd)
+            os.replace(tmp_path, config_path)
             
-            print(f"Config saved to: {config_path}")
+            self._config_cache = ((st.st_mtime_ns, st.st_size), dict(config))
+            logger.debug("Config saved to: %s", config_path)
             return config
         except Exception as e:
-            print(f"Error saving config: {e}")
+            logger.error("Error saving config: %s", e)
             return config
     
     def load_config(self) -> Dict[str, Any]:
@@ -177,50 +267,76 @@ class OptimizedProjectSettings:
         
         try:
             config_path = self.get_config_path()
-            if os.path.exists(config_path):
+            try:
+                st = os.stat(config_path)
+            except FileNotFoundError:
+                self._config_cache = None
+                return {}
+            
+            stamp = (st.st_mtime_ns, st.st_size)
+            if self._config_cache is not None and self._config_cache[0] == stamp:
+                return dict(self._config_cache[1])
+            
+            if orjson is not None:
+                with open(config_path, 'rb') as f:
+                    config = orjson.loads(f.read())
+            else:
                 with open(config_path, 'r', encoding='utf-8') as f:
                     config = json.load(f)
-                print(f"Config loaded from: {config_path}")
-                return config
-            return {}
+            self._config_cache = (stamp, config)
+            logger.debug("Config loaded from: %s", config_path)
+            return dict(config)
         except Exception as e:
-            print(f"Error loading config: {e}")
+            logger.error("Error loading config: %s", e)
             return {}
     
     def save_index(self, file_index: Union[Dict[str, Any], TrieFileIndex, SQLiteFileIndex]):
         """Save file index using the configured storage backend."""
         try:
             if self.storage_backend == 'sqlite':
-                if isinstance(self.file_index, TrieFileIndex):
-                    # For Trie index, we need to serialize it
+                if isinstance(file_index, TrieFileIndex):
+                    # Trie index has its own compact on-disk format
+                    # Write to a temp file and swap it in: a previously loaded
+                    # index may still be mmapped from index_path.
                     index_path = self.get_index_path()
-                    import pickle
-                    with open(index_path, 'wb') as f:
-                        pickle.dump(file_index, f)
-                    print(f"Trie index saved to: {index_path}")
+                    tmp_path = f"{index_path}.tmp"
+                    try:
+                        with open(tmp_path, 'wb') as f:
+                            file_index.serialize(f)
+                    except (TypeError, ValueError) as e:
+                        # File info the flat format's JSON can't hold (e.g. a
+                        # datetime): pickle the whole index instead, which
+                        # load_index also reads, rather than keep a stale file
+                        logger.warning("Trie index metadata is not JSON-serializable (%s); saving it with pickle", e)
+                        self._save_legacy_index(file_index)
+                    else:
+                        os.replace(tmp_path, index_path)
+                        logger.debug("Trie index saved to: %s", index_path)
                 elif isinstance(self.file_index, SQLiteFileIndex):
                     # SQLite file index is already persisted
-                    print("SQLite file index is automatically persisted")
+                    logger.debug("SQLite file index is automatically persisted")
                 else:
                     # Legacy dict-based index
                     self._save_legacy_index(file_index)
             else:
                 # Memory-based storage
                 self.file_index = file_index
-                print("Index saved to memory")
+                logger.debug("Index saved to memory")
         except Exception as e:
-            print(f"Error saving index: {e}")
+            logger.error("Error saving index: %s", e)
     
     def _save_legacy_index(self, file_index: Dict[str, Any]):
         """Save legacy dictionary-based index."""
         try:
             index_path = self.get_index_path()
+            tmp_path = f"{index_path}.tmp"
             import pickle
-            with open(index_path, 'wb') as f:
+            with open(tmp_path, 'wb') as f:
                 pickle.dump(file_index, f)
-            print(f"Legacy index saved to: {index_path}")
+            os.replace(tmp_path, index_path)
+            logger.debug("Legacy index saved to: %s", index_path)
         except Exception as e:
-            print(f"Error saving legacy index: {e}")
+            logger.error("Error saving legacy index: %s", e)
     
     def load_index(self) -> Union[Dict[str, Any], TrieFileIndex, SQLiteFileIndex, None]:
         """Load file index using the configured storage backend."""
@@ -233,23 +349,34 @@ class OptimizedProjectSettings:
                     # Load Trie index from file
                     index_path = self.get_index_path()
                     if os.path.exists(index_path):
-                        import pickle
                         with open(index_path, 'rb') as f:
-                            loaded_index = pickle.load(f)
-                        print(f"Trie index loaded from: {index_path}")
+                            if f.read(len(TRIE_MAGIC)) == TRIE_MAGIC:
+                                # Map the file instead of reading it; the OS
+                                # pages in only the nodes lookups visit.
+                                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                                if hasattr(mmap, 'MADV_RANDOM'):
+                                    mm.madvise(mmap.MADV_RANDOM)
+                                loaded_index = TrieFileIndex.from_buffer(mm)
+                            else:
+                                # Dict-based index, or a Trie index whose file info needed
+                                # pickling, saved by _save_legacy_index
+                                import pickle
+                                f.seek(0)
+                                loaded_index = pickle.load(f)
+                        logger.debug("Trie index loaded from: %s", index_path)
                         return loaded_index
                     else:
                         # Return empty Trie index
                         return TrieFileIndex()
                 else:
                     # SQLite file index is already loaded
-                    print("SQLite file index is ready")
+                    logger.debug("SQLite file index is ready")
                     return self.file_index
             else:
                 # Memory-based storage - try to load from legacy pickle file
                 return self._load_legacy_index()
         except Exception as e:
-            print(f"Error loading index: {e}")
+            logger.error("Error loading index: %s", e)
             return {} if self.storage_backend != 'sqlite' else None
     
     def _load_legacy_index(self) -> Dict[str, Any]:
@@ -260,11 +387,11 @@ class OptimizedProjectSettings:
                 import pickle
                 with open(index_path, 'rb') as f:
                     index = pickle.load(f)
-                print(f"Legacy index loaded from: {index_path}")
+                logger.debug("Legacy index loaded from: %s", index_path)
                 return index
             return {}
         except Exception as e:
-            print(f"Error loading legacy index: {e}")
+            logger.error("Error loading legacy index: %s", e)
             return {}
     
     def save_cache(self, content_cache: Dict[str, Any]):
@@ -272,36 +399,41 @@ class OptimizedProjectSettings:
         try:
             if self.storage_backend == 'sqlite':
                 # Save to SQLite storage
-                for key, value in content_cache.items():
-                    self.cache_storage.put(key, value)
+                self.cache_storage.put_many(content_cache.items())
                 self.cache_storage.flush()
-                print(f"Cache saved to SQLite storage ({len(content_cache)} items)")
+                logger.debug("Cache saved to SQLite storage (%s items)", len(content_cache))
             else:
                 # Memory-based storage
                 self.cache_storage.update(content_cache)
-                print(f"Cache saved to memory ({len(content_cache)} items)")
+                logger.debug("Cache saved to memory (%s items)", len(content_cache))
         except Exception as e:
-            print(f"Error saving cache: {e}")
+            logger.error("Error saving cache: %s", e)
     
-    def load_cache(self) -> Dict[str, Any]:
-        """Load content cache using the configured storage backend."""
+    def load_cache(self, materialize: bool = True) -> Mapping[str, Any]:
+        """Load content cache using the configured storage backend.
+        
+        Args:
+            materialize: Copy every entry into a new dict. Pass False to get
+                a read-only view backed by the storage, which only fetches
+                the entries that are actually looked up.
+        """
         if self.skip_load:
             return {}
         
         try:
+            if not materialize:
+                return self.cache_storage
             if self.storage_backend == 'sqlite':
                 # Load from SQLite storage
-                cache = {}
-                for key, value in self.cache_storage.items():
-                    cache[key] = value
-                print(f"Cache loaded from SQLite storage ({len(cache)} items)")
+                cache = dict(self.cache_storage.items())
+                logger.debug("Cache loaded from SQLite storage (%s items)", len(cache))
                 return cache
             else:
                 # Memory-based storage
-                print(f"Cache loaded from memory ({len(self.cache_storage)} items)")
+                logger.debug("Cache loaded from memory (%s items)", len(self.cache_storage))
                 return dict(self.cache_storage)
         except Exception as e:
-            print(f"Error loading cache: {e}")
+            logger.error("Error loading cache: %s", e)
             return {}
     
     def save_metadata(self, metadata: Dict[str, Any]):
@@ -309,36 +441,40 @@ class OptimizedProjectSettings:
         try:
             if self.storage_backend == 'sqlite':
                 # Save to SQLite storage
-                for key, value in metadata.items():
-                    self.metadata_storage.put(key, value)
+                self.metadata_storage.put_many(metadata.items())
                 self.metadata_storage.flush()
-                print(f"Metadata saved to SQLite storage ({len(metadata)} items)")
+                logger.debug("Metadata saved to SQLite storage (%s items)", len(metadata))
             else:
                 # Memory-based storage
                 self.metadata_storage.update(metadata)
-                print(f"Metadata saved to memory ({len(metadata)} items)")
+                logger.debug("Metadata saved to memory (%s items)", len(metadata))
         except Exception as e:
-            print(f"Error saving metadata: {e}")
+            logger.error("Error saving metadata: %s", e)
     
-    def load_metadata(self) -> Dict[str, Any]:
-        """Load file metadata using the configured storage backend."""
+    def load_metadata(self, materialize: bool = True) -> Mapping[str, Any]:
+        """Load file metadata using the configured storage backend.
+        
+        Args:
+            materialize: Copy every entry into a new dict. Pass False to get
+                a read-only view backed by the storage.
+        """
         if self.skip_load:
             return {}
         
         try:
+            if not materialize:
+                return self.metadata_storage
             if self.storage_backend == 'sqlite':
                 # Load from SQLite storage
-                metadata = {}
-                for key, value in self.metadata_storage.items():
-                    metadata[key] = value
-                print(f"Metadata loaded from SQLite storage ({len(metadata)} items)")
+                metadata = dict(self.metadata_storage.items())
+                logger.debug("Metadata loaded from SQLite storage (%s items)", len(metadata))
                 return metadata
             else:
                 # Memory-based storage
-                print(f"Metadata loaded from memory ({len(self.metadata_storage)} items)")
+                logger.debug("Metadata loaded from memory (%s items)", len(self.metadata_storage))
                 return dict(self.metadata_storage)
         except Exception as e:
-            print(f"Error loading metadata: {e}")
+            logger.error("Error loading metadata: %s", e)
             return {}
     
     def clear(self):
@@ -346,7 +482,7 @@ class OptimizedProjectSettings:
         try:
             if self.storage_backend == 'sqlite':
                 # For SQLite, it's safer to delete the database files and recreate storage objects
-                print("Clearing SQLite storage...")
+                logger.debug("Clearing SQLite storage...")
                 
                 # Close existing storage objects
                 if hasattr(self.cache_storage, 'close'):
@@ -355,18 +491,14 @@ class OptimizedProjectSettings:
                     self.metadata_storage.close()
                 if hasattr(self.file_index, 'close'):
                     self.file_index.close()
+                self._close_connection()
                 
                 # Delete database files
-                if os.path.exists(self.settings_path):
-                    for filename in os.listdir(self.settings_path):
-                        file_path = os.path.join(self.settings_path, filename)
-                        if os.path.isfile(file_path) and filename.endswith('.db'):
-                            os.unlink(file_path)
-                            print(f"Deleted database file: {file_path}")
+                self._unlink_settings_files(db_files=True)
                 
                 # Recreate storage objects with fresh databases
                 self._init_storage_backend()
-                print("SQLite storage cleared and reinitialized")
+                logger.debug("SQLite storage cleared and reinitialized")
             else:
                 # Clear memory-based storage
                 self.cache_storage.clear()
@@ -375,17 +507,25 @@ class OptimizedProjectSettings:
                     self.file_index.clear()
                 else:
                     self.file_index = {}
-                print("Memory storage cleared")
+                logger.debug("Memory storage cleared")
             
             # Also clear any remaining legacy files
-            if os.path.exists(self.settings_path):
-                for filename in os.listdir(self.settings_path):
-                    file_path = os.path.join(self.settings_path, filename)
-                    if os.path.isfile(file_path) and not filename.endswith('.db'):
-                        os.unlink(file_path)
-                        print(f"Deleted legacy file: {file_path}")
+            self._unlink_settings_files(db_files=False)
         except Exception as e:
-            print(f"Error clearing settings: {e}")
+            logger.error("Error clearing settings: %s", e)
+    
+    def _unlink_settings_files(self, db_files: bool):
+        """Delete either the database files or all other files in the settings directory."""
+        # scandir reports the file type from the directory read itself, so
+        # there is no extra stat per entry
+        try:
+            with os.scandir(self.settings_path) as entries:
+                for entry in entries:
+                    if entry.is_file(follow_symlinks=False) and entry.name.endswith(_DB_SUFFIXES) == db_files:
+                        os.unlink(entry.path)
+                        logger.debug("Deleted %s file: %s", "database" if db_files else "legacy", entry.path)
+        except FileNotFoundError:
+            pass
     
     def get_stats(self) -> Dict[str, Any]:
         """Get statistics for the settings."""
@@ -421,7 +561,7 @@ class OptimizedProjectSettings:
             
             return stats
         except Exception as e:
-            print(f"Error getting stats: {e}")
+            logger.error("Error getting stats: %s", e)
             return {'error': str(e)}
     
     def get_search_tools_config(self) -> Dict[str, Any]:
@@ -440,9 +580,10 @@ class OptimizedProjectSettings:
     
     def refresh_available_strategies(self):
         """Force a refresh of the available search tools list."""
-        print("Refreshing available search strategies...")
+        logger.debug("Refreshing available search strategies...")
+        _probe_strategies.cache_clear()
         self.available_strategies = _get_available_strategies()
-        print(f"Available strategies found: {[s.name for s in self.available_strategies]}")
+        logger.debug("Available strategies found: %s", [s.name for s in self.available_strategies])
     
     def close(self):
         """Close storage backends and release resources."""
@@ -454,9 +595,24 @@ class OptimizedProjectSettings:
                     self.metadata_storage.close()
                 if hasattr(self.file_index, 'close'):
                     self.file_index.close()
-                print("SQLite storage backends closed")
+                self._close_connection()
+                logger.debug("SQLite storage backends closed")
         except Exception as e:
-            print(f"Error closing storage backends: {e}")
+            logger.error("Error closing storage backends: %s", e)
+    
+    def __enter__(self) -> 'OptimizedProjectSettings':
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    def _close_connection(self):
+        """Close the shared store.db connection, if open."""
+        if self._conn_finalizer is not None:
+            # Calling the finalizer closes the connection and disarms it
+            self._conn_finalizer()
+            self._conn_finalizer = None
+        self._conn = None
     
     def get_storage_info(self) -> Dict[str, Any]:
         """Get detailed information about the storage backend."""
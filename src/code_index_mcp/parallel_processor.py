@@ -6,10 +6,12 @@ to avoid blocking the event loop and improve performance.
 """
 
 import os
+import sys
 import asyncio
+import itertools
 import concurrent.futures
-from typing import List, Dict, Any, Callable, Optional, Tuple, AsyncIterator
-from threading import Thread, Lock
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Mapping, Optional, Tuple, Type, Union, AsyncIterator
+from threading import Thread
 from queue import Queue, Empty
 from dataclasses import dataclass
 from pathlib import Path
@@ -22,16 +24,24 @@ from .progress_tracker import (
 )
 
 
-@dataclass
+@dataclass(slots=True)
 class IndexingTask:
     """Represents a single indexing task."""
     directory_path: str
-    files: List[str]
+    # Paths, or os.DirEntry objects when the caller scanned with os.scandir;
+    # entries already know their name, so no path splitting is needed.
+    # DirEntry objects cannot be pickled, so they need a thread pool.
+    files: List[Union[str, os.DirEntry]]
     task_id: str
     metadata: Optional[Dict[str, Any]] = None
+    # Checked before each file, so a cancelled task stops mid-chunk and
+    # returns what it has indexed so far. Tokens hold a lock and cannot be
+    # pickled, so they need a thread pool; a copy sent to a worker process
+    # would never see cancel() anyway.
+    cancellation_token: Optional[CancellationToken] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class IndexingResult:
     """Result of an indexing task."""
     task_id: str
@@ -41,36 +51,288 @@ class IndexingResult:
     success: bool
 
 
+@dataclass(slots=True)
+class IndexingResultColumnar:
+    """Result of an indexing task with one list per file field.
+    
+    paths[i] and extensions[i] describe the same file, and every file
+    shares metadata. indexed_files rebuilds the per-file dicts of
+    IndexingResult for code that expects them.
+    """
+    task_id: str
+    paths: List[str]
+    extensions: List[str]
+    metadata: Mapping[str, Any]
+    errors: List[str]
+    processing_time: float
+    success: bool
+    
+    @property
+    def indexed_files(self) -> List[Dict[str, Any]]:
+        metadata = self.metadata
+        return [{
+            'path': path,
+            'type': 'file',
+            'extension': extension,
+            'metadata': metadata
+        } for path, extension in zip(self.paths, self.extensions)]
+
+
+class _EmptyMetadata(Mapping):
+    """Read-only empty mapping shared by every file of tasks without metadata.
+    
+    Unlike MappingProxyType it pickles (by reference to the module-level
+    instance), so results coming back from worker processes share it too.
+    """
+    __slots__ = ()
+    
+    def __getitem__(self, key):
+        raise KeyError(key)
+    
+    def __iter__(self):
+        return iter(())
+    
+    def __len__(self) -> int:
+        return 0
+    
+    def __repr__(self) -> str:
+        return '{}'
+    
+    def __reduce__(self):
+        return '_EMPTY_METADATA'
+
+
+_EMPTY_METADATA = _EmptyMetadata()
+
+
+def _name_extension(name: str) -> str:
+    """Return the extension of a bare file name, as os.path.splitext would.
+    
+    Extensions are interned: a project has a few dozen distinct ones, so
+    every file with the same extension shares one str.
+    """
+    dot = name.rfind('.')
+    # Leading dots mark a hidden file, not an extension
+    return sys.intern(name[dot:]) if dot > 0 and name[:dot].strip('.') else ''
+
+
+def _file_extension(path: str) -> str:
+    """Return os.path.splitext(path)[1] without its generic-path overhead."""
+    name = path.rpartition(os.sep)[2]
+    if os.altsep:
+        name = name.rpartition(os.altsep)[2]
+    return _name_extension(name)
+
+
+def _task_columns(files: List[Union[str, os.DirEntry]]) -> Tuple[List[str], List[str]]:
+    """Return the paths of a task's files and their extensions."""
+    if files and isinstance(files[0], os.DirEntry):
+        return [entry.path for entry in files], [_name_extension(entry.name) for entry in files]
+    return list(files), [_file_extension(file_path) for file_path in files]
+
+
+def _until_cancelled(files: Iterable[Union[str, os.DirEntry]],
+                     token: CancellationToken) -> Iterator[Union[str, os.DirEntry]]:
+    """Yield files until token is cancelled, checking before each one."""
+    is_cancelled = token.is_cancelled
+    for file in files:
+        if is_cancelled():
+            return
+        yield file
+
+
+def process_task(task: IndexingTask) -> IndexingResult:
+    """Process a single indexing task.
+    
+    Defined at module level so it can be pickled to ProcessPoolExecutor
+    workers.
+    """
+    start_time = time.time()
+    token = task.cancellation_token
+    metadata = task.metadata or _EMPTY_METADATA
+    
+    # Nothing below can fail per file for str paths or DirEntry objects, so
+    # one handler around the whole task covers any unexpected failure
+    try:
+        files = task.files
+        entries = files if token is None else _until_cancelled(files, token)
+        if files and isinstance(files[0], os.DirEntry):
+            indexed_files = [{
+                'path': entry.path,
+                'type': 'file',
+                'extension': _name_extension(entry.name),
+                'metadata': metadata
+            } for entry in entries]
+        else:
+            indexed_files = [{
+                'path': file_path,
+                'type': 'file',
+                'extension': _file_extension(file_path),
+                'metadata': metadata
+            } for file_path in entries]
+    except Exception as e:
+        return IndexingResult(
+            task_id=task.task_id,
+            indexed_files=[],
+            errors=[str(e)],
+            processing_time=time.time() - start_time,
+            success=False
+        )
+    
+    if len(indexed_files) < len(files):
+        # Cancelled part-way: keep the partial result, marked as failed
+        return IndexingResult(
+            task_id=task.task_id,
+            indexed_files=indexed_files,
+            errors=[token.cancellation_reason or "Operation cancelled"],
+            processing_time=time.time() - start_time,
+            success=False
+        )
+    
+    return IndexingResult(
+        task_id=task.task_id,
+        indexed_files=indexed_files,
+        errors=[],
+        processing_time=time.time() - start_time,
+        success=True
+    )
+
+
+def process_task_columnar(task: IndexingTask) -> 'IndexingResultColumnar':
+    """Process a single indexing task into parallel path/extension lists.
+    
+    A drop-in processor_func for ParallelIndexer when the caller reads
+    paths and extensions directly: no dict is built per file.
+    """
+    start_time = time.time()
+    token = task.cancellation_token
+    files = task.files
+    try:
+        paths, extensions = _task_columns(files if token is None else list(_until_cancelled(files, token)))
+    except Exception as e:
+        return IndexingResultColumnar(
+            task_id=task.task_id,
+            paths=[],
+            extensions=[],
+            metadata=_EMPTY_METADATA,
+            errors=[str(e)],
+            processing_time=time.time() - start_time,
+            success=False
+        )
+    
+    if len(paths) < len(files):
+        # Cancelled part-way: keep the partial result, marked as failed
+        return IndexingResultColumnar(
+            task_id=task.task_id,
+            paths=paths,
+            extensions=extensions,
+            metadata=task.metadata or _EMPTY_METADATA,
+            errors=[token.cancellation_reason or "Operation cancelled"],
+            processing_time=time.time() - start_time,
+            success=False
+        )
+    
+    return IndexingResultColumnar(
+        task_id=task.task_id,
+        paths=paths,
+        extensions=extensions,
+        metadata=task.metadata or _EMPTY_METADATA,
+        errors=[],
+        processing_time=time.time() - start_time,
+        success=True
+    )
+
+
+def _run_task(processor_func: Callable[[IndexingTask], IndexingResult],
+              task: IndexingTask) -> IndexingResult:
+    """Run processor_func on task, turning an exception into a failed result."""
+    try:
+        return processor_func(task)
+    except Exception as e:
+        return IndexingResult(
+            task_id=task.task_id,
+            indexed_files=[],
+            errors=[str(e)],
+            processing_time=0.0,
+            success=False
+        )
+
+
+def _run_tasks(processor_func: Callable[[IndexingTask], IndexingResult],
+               tasks: List[IndexingTask]) -> List[IndexingResult]:
+    """Run _run_task over a group of tasks in one executor job."""
+    return [_run_task(processor_func, task) for task in tasks]
+
+
 class ParallelIndexer:
     """Handles parallel indexing of directory chunks."""
     
-    def __init__(self, max_workers: int = 4, chunk_size: int = 100):
+    # Chunks at least this large carry enough CPU-bound work to outweigh
+    # pickling them to worker processes
+    PROCESS_POOL_MIN_CHUNK = 1000
+    # Batches with fewer files than this run inline on the calling thread;
+    # executor round trips would cost more than the work itself
+    SEQUENTIAL_MAX_FILES = 200
+    # Most chunks one executor job runs before reporting back to the loop
+    COMPLETION_GROUP = 32
+    
+    def __init__(self, max_workers: int = 4, chunk_size: int = 100,
+                 executor_cls: Optional[Type[concurrent.futures.Executor]] = None,
+                 executor_shards: int = 1):
+        """Initialize the indexer.
+        
+        Args:
+            max_workers: Number of worker threads or processes
+            chunk_size: Number of files per IndexingTask from create_chunks
+            executor_cls: Executor to run chunks in. Defaults to
+                ProcessPoolExecutor when chunk_size reaches
+                PROCESS_POOL_MIN_CHUNK, so the GIL-bound per-file loop
+                scales across cores, and ThreadPoolExecutor otherwise.
+                With a process pool, processor_func must be picklable
+                (a module-level function such as process_task), and tasks
+                must not carry a cancellation_token: the token cannot be
+                pickled, and a worker's copy would never see cancel().
+            executor_shards: Split max_workers across this many thread
+                pools and deal chunks out round-robin, so submitters and
+                workers contend on several work queues instead of one.
+                Worth raising only for many small chunks; a slow chunk
+                holds up its own shard. Process pools are never sharded.
+        """
         self.max_workers = max_workers
         self.chunk_size = chunk_size
-        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
-        self._active_tasks: Dict[str, asyncio.Task] = {}
-        self._task_counter = 0
-        self._lock = Lock()
+        if executor_cls is None:
+            executor_cls = (concurrent.futures.ProcessPoolExecutor
+                            if chunk_size >= self.PROCESS_POOL_MIN_CHUNK
+                            else concurrent.futures.ThreadPoolExecutor)
+        if issubclass(executor_cls, concurrent.futures.ProcessPoolExecutor):
+            executor_shards = 1
+        executor_shards = max(1, min(executor_shards, max_workers))
+        per_shard, extra = divmod(max_workers, executor_shards)
+        self.executors: List[concurrent.futures.Executor] = [
+            executor_cls(max_workers=per_shard + (shard < extra))
+            for shard in range(executor_shards)
+        ]
+        self.executor = self.executors[0]
+        self._active_tasks: Dict[str, asyncio.Future] = {}
+        # next() on a count is atomic under the GIL, so no lock is needed
+        self._task_counter = itertools.count()
     
-    def create_chunks(self, file_list: List[str], base_path: str) -> List[IndexingTask]:
+    def create_chunks(self, file_list: Iterable[str], base_path: str) -> List[IndexingTask]:
         """Divide file list into chunks for parallel processing."""
-        chunks = []
-        
-        for i in range(0, len(file_list), self.chunk_size):
-            chunk_files = file_list[i:i + self.chunk_size]
-            
-            with self._lock:
-                task_id = f"task_{self._task_counter}"
-                self._task_counter += 1
-            
-            task = IndexingTask(
+        return list(self._iter_chunks(file_list, base_path))
+    
+    def _iter_chunks(self, file_list: Iterable[str], base_path: str) -> Iterator[IndexingTask]:
+        """Yield chunks lazily; file_list may be any iterable, e.g. a scan."""
+        files = iter(file_list)
+        while True:
+            chunk_files = list(itertools.islice(files, self.chunk_size))
+            if not chunk_files:
+                return
+            yield IndexingTask(
                 directory_path=base_path,
                 files=chunk_files,
-                task_id=task_id
+                task_id=f"task_{next(self._task_counter)}"
             )
-            chunks.append(task)
-        
-        return chunks
     
     async def process_chunk_async(self, task: IndexingTask, 
                                   processor_func: Callable[[IndexingTask], IndexingResult]) -> IndexingResult:
@@ -93,45 +355,93 @@ class ParallelIndexer:
     async def process_chunks_parallel(self, tasks: List[IndexingTask], 
                                       processor_func: Callable[[IndexingTask], IndexingResult],
                                       progress_callback: Optional[Callable[[float], None]] = None) -> List[IndexingResult]:
-        """Process multiple chunks in parallel."""
+        """Process multiple chunks in parallel.
+        
+        Results come back in completion order when progress_callback is
+        given, and in task order otherwise. progress_callback is called at
+        most about 100 times per batch, and always on the last chunk.
+        """
+        
+        total = len(tasks)
+        # Chunks to complete between progress_callback calls
+        progress_step = max(1, -(-total // 100))
+        
+        if total <= 1 or sum(len(task.files) for task in tasks) < self.SEQUENTIAL_MAX_FILES:
+            results = []
+            for task in tasks:
+                results.append(_run_task(processor_func, task))
+                completed = len(results)
+                if progress_callback and (completed % progress_step == 0 or completed == total):
+                    progress_callback(completed / total)
+            return results
         
-        # Create async tasks for all chunks
-        async_tasks = []
-        for task in tasks:
-            async_task = asyncio.create_task(
-                self.process_chunk_async(task, processor_func)
+        # Submit chunks in groups: a worker runs a whole group and wakes the
+        # event loop once for it, instead of once per chunk. Groups stay
+        # small enough that every worker still gets several. With nothing to
+        # report per chunk, groups grow to what Executor.map's chunksize
+        # would be, so a process pool ships tasks to workers in bulk.
+        group_size = max(1, total // (self.max_workers * 4))
+        if progress_callback is not None:
+            group_size = min(self.COMPLETION_GROUP, group_size)
+        loop = asyncio.get_event_loop()
+        futures: Dict[asyncio.Future, List[IndexingTask]] = {}
+        done_queue: asyncio.Queue = asyncio.Queue()
+        for group_index, start in enumerate(range(0, total, group_size)):
+            group = tasks[start:start + group_size]
+            future = asyncio.wrap_future(
+                self._shard(group_index).submit(_run_tasks, processor_func, group), loop=loop
             )
-            async_tasks.append(async_task)
-            self._active_tasks[task.task_id] = async_task
+            future.add_done_callback(done_queue.put_nowait)
+            futures[future] = group
+            for task in group:
+                self._active_tasks[task.task_id] = future
         
-        results = []
+        group_results: Dict[asyncio.Future, List[IndexingResult]] = {}
         completed = 0
-        total = len(async_tasks)
+        last_reported = 0
         
         try:
-            # Process tasks as they complete
-            for coro in asyncio.as_completed(async_tasks):
-                result = await coro
-                results.append(result)
-                completed += 1
+            # Process groups as they complete
+            while completed < total:
+                future = await done_queue.get()
+                group = futures[future]
+                try:
+                    group_results[future] = future.result()
+                except Exception as e:
+                    group_results[future] = [IndexingResult(
+                        task_id=task.task_id,
+                        indexed_files=[],
+                        errors=[str(e)],
+                        processing_time=0.0,
+                        success=False
+                    ) for task in group]
+                completed += len(group)
                 
                 # Update progress
-                if progress_callback:
-                    progress = completed / total
-                    progress_callback(progress)
+                if progress_callback and (completed - last_reported >= progress_step or completed == total):
+                    last_reported = completed
+                    progress_callback(completed / total)
                 
-                # Clean up completed task
-                if result.task_id in self._active_tasks:
-                    del self._active_tasks[result.task_id]
+                # Clean up completed tasks
+                for task in group:
+                    self._active_tasks.pop(task.task_id, None)
         
         except asyncio.CancelledError:
-            # Cancel all remaining tasks
-            for task in async_tasks:
-                if not task.done():
-                    task.cancel()
+            # Cancel all remaining chunks
+            for future, group in futures.items():
+                if not future.done():
+                    future.cancel()
+                for task in group:
+                    self._active_tasks.pop(task.task_id, None)
             raise
         
-        return results
+        # Completion order when reporting progress, task order otherwise
+        order = group_results if progress_callback else futures
+        return [result for future in order for result in group_results[future]]
+    
+    def _shard(self, index: int) -> concurrent.futures.Executor:
+        """Return the executor that the index-th chunk of a batch goes to."""
+        return self.executors[index % len(self.executors)]
     
     def cancel_all_tasks(self):
         """Cancel all active tasks."""
@@ -143,125 +453,138 @@ class ParallelIndexer:
         """Get the number of currently active tasks."""
         return len(self._active_tasks)
     
-    def shutdown(self):
-        """Shutdown the thread pool executor."""
-        self.executor.shutdown(wait=True)
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False):
+        """Shutdown the executors.
+        
+        Args:
+            wait: Block until running chunks have finished
+            cancel_futures: Drop chunks that have not started yet
+        """
+        for executor in self.executors:
+            executor.shutdown(wait=wait, cancel_futures=cancel_futures)
     
     async def process_files(self, tasks: List[IndexingTask]) -> List[IndexingResult]:
         """Process files using the parallel indexer."""
-        
-        def process_task(task: IndexingTask) -> IndexingResult:
-            """Process a single indexing task."""
-            start_time = time.time()
-            indexed_files = []
-            errors = []
-            
-            try:
-                # Process each file in the task
-                for file_path in task.files:
-                    try:
-                        # Get file extension
-                        _, ext = os.path.splitext(file_path)
-                        
-                        # Create file info
-                        file_info = {
-                            'path': file_path,
-                            'type': 'file',
-                            'extension': ext,
-                            'metadata': task.metadata or {}
-                        }
-                        
-                        indexed_files.append(file_info)
-                        
-                    except Exception as e:
-                        errors.append(f"Error processing {file_path}: {str(e)}")
-                
-                processing_time = time.time() - start_time
-                
-                return IndexingResult(
-                    task_id=task.task_id,
-                    indexed_files=indexed_files,
-                    errors=errors,
-                    processing_time=processing_time,
-                    success=len(errors) == 0
-                )
-                
-            except Exception as e:
-                processing_time = time.time() - start_time
-                return IndexingResult(
-                    task_id=task.task_id,
-                    indexed_files=[],
-                    errors=[str(e)],
-                    processing_time=processing_time,
-                    success=False
-                )
-        
-        # Process tasks in parallel
         return await self.process_chunks_parallel(tasks, process_task)
 
 
 class AsyncFileProcessor:
     """Processes files asynchronously with progress tracking."""
     
+    # Upper bound on files per executor job in process_files_async
+    BATCH_SIZE = 64
+    # Minimum seconds between progress_callback calls
+    PROGRESS_INTERVAL = 0.05
+    
     def __init__(self, max_concurrent: int = 10):
         self.max_concurrent = max_concurrent
-        self._semaphore = asyncio.Semaphore(max_concurrent)
+        # Own pool sized to the worker count, rather than the loop's default
+        # executor shared with unrelated code
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_concurrent, thread_name_prefix='indexer-io'
+        )
         self._processed_count = 0
         self._total_count = 0
-        self._lock = asyncio.Lock()
+    
+    async def __aenter__(self) -> 'AsyncFileProcessor':
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    def close(self):
+        """Shut down the thread pool, dropping batches that have not started."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
     
     async def process_files_async(self, file_paths: List[str], 
                                   processor_func: Callable[[str], Dict[str, Any]],
-                                  progress_callback: Optional[Callable[[int, int], None]] = None) -> List[Dict[str, Any]]:
-        """Process files asynchronously with concurrency control."""
+                                  progress_callback: Optional[Callable[[int, int], None]] = None,
+                                  batch_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Process files asynchronously with concurrency control.
+        
+        Files are handed to the thread pool in batches so each executor job
+        and progress update covers many files. By default a batch is up to
+        64 files, smaller for short lists so every worker still gets work.
+        A fixed pool of max_concurrent workers drains a bounded queue of
+        batches, so task bookkeeping stays constant however long the list.
+        """
         
         self._total_count = len(file_paths)
         self._processed_count = 0
+        last_progress = 0.0
+        if batch_size is None:
+            batch_size = min(self.BATCH_SIZE, max(1, len(file_paths) // self.max_concurrent))
         
-        async def process_single_file(file_path: str) -> Dict[str, Any]:
-            async with self._semaphore:
-                loop = asyncio.get_event_loop()
-                
+        def process_batch(paths: List[str]) -> List[Dict[str, Any]]:
+            results = []
+            for file_path in paths:
                 try:
-                    # Run blocking operation in thread pool
-                    result = await loop.run_in_executor(None, processor_func, file_path)
-                    
-                    async with self._lock:
-                        self._processed_count += 1
-                        if progress_callback:
-                            progress_callback(self._processed_count, self._total_count)
-                    
-                    return result
-                
+                    results.append(processor_func(file_path))
+                except Exception as e:
+                    results.append({
+                        'file_path': file_path,
+                        'error': str(e),
+                        'success': False
+                    })
+            return results
+        
+        loop = asyncio.get_event_loop()
+        batch_count = -(-len(file_paths) // batch_size)
+        batch_results: List[Optional[List[Dict[str, Any]]]] = [None] * batch_count
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_concurrent * 2)
+        
+        async def worker() -> None:
+            while True:
+                index = await queue.get()
+                if index is None:
+                    break
+                start = index * batch_size
+                paths = file_paths[start:start + batch_size]
+                try:
+                    # Run blocking operations in thread pool
+                    batch_results[index] = await loop.run_in_executor(self._executor, process_batch, paths)
                 except Exception as e:
-                    async with self._lock:
-                        self._processed_count += 1
-                        if progress_callback:
-                            progress_callback(self._processed_count, self._total_count)
-                    
-                    return {
+                    batch_results[index] = [{
                         'file_path': file_path,
                         'error': str(e),
                         'success': False
-                    }
+                    } for file_path in paths]
+                # Runs on the event loop thread with no await in between, so
+                # the update cannot interleave with another batch's
+                nonlocal last_progress
+                self._processed_count += len(paths)
+                if progress_callback:
+                    # Report at most every PROGRESS_INTERVAL seconds, plus
+                    # the final count
+                    now = time.monotonic()
+                    if (now - last_progress >= self.PROGRESS_INTERVAL
+                            or self._processed_count == self._total_count):
+                        last_progress = now
+                        progress_callback(self._processed_count, self._total_count)
+        
+        worker_count = min(self.max_concurrent, batch_count)
         
-        # Create tasks for all files
-        tasks = [process_single_file(fp) for fp in file_paths]
+        async def producer() -> None:
+            for index in range(batch_count):
+                await queue.put(index)
+            # One stop marker per worker, queued behind the real batches
+            for _ in range(worker_count):
+                await queue.put(None)
         
-        # Execute all tasks concurrently
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        tasks = [asyncio.create_task(worker()) for _ in range(worker_count)]
+        tasks.append(asyncio.create_task(producer()))
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # A failed worker must not leave the producer blocked on a full
+            # queue, and cancellation must reach every worker
+            for task in tasks:
+                task.cancel()
+            raise
         
-        # Handle any exceptions that occurred
         processed_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                processed_results.append({
-                    'file_path': file_paths[i],
-                    'error': str(result),
-                    'success': False
-                })
-            else:
-                processed_results.append(result)
+        for results in batch_results:
+            processed_results.extend(results)
         
         return processed_results
 
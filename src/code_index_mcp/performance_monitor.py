@@ -9,16 +9,28 @@ import time
 import json
 import logging
 import threading
-from typing import Dict, Any, Optional, List, Callable, Union
+import itertools
+from typing import DefaultDict, Dict, Any, Optional, List, Callable, Iterable, Tuple, Union
+from array import array
+from bisect import bisect_left
+from math import frexp, ldexp
+from itertools import accumulate
 from dataclasses import dataclass, asdict, field
-from collections import defaultdict, deque
+from collections import defaultdict
 from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
 import os
+import sys
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-@dataclass
+
+@dataclass(slots=True)
 class OperationMetrics:
     """Metrics for a single operation."""
     operation_name: str
@@ -28,26 +40,32 @@ class OperationMetrics:
     success: bool = True
     error_message: Optional[str] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # Monotonic start in integer ns, used for duration_ms; start_time and
+    # end_time stay wall-clock for reporting
+    start_ns: int = field(default_factory=time.perf_counter_ns, repr=False)
     
     def finish(self, success: bool = True, error_message: Optional[str] = None, **metadata):
         """Mark operation as finished."""
         self.end_time = time.time()
-        self.duration_ms = (self.end_time - self.start_time) * 1000
+        self.duration_ms = (time.perf_counter_ns() - self.start_ns) / 1_000_000
         self.success = success
         self.error_message = error_message
-        self.metadata.update(metadata)
+        if metadata:
+            self.metadata.update(metadata)
 
 
-@dataclass
+@dataclass(slots=True)
 class Counter:
-    """Thread-safe counter for metrics."""
+    """Thread-safe counter for metrics.
+    
+    Callers on a hot path can keep the Counter from get_counter() and call
+    increment() on it directly, skipping the by-name lookup.
+    """
     name: str
     value: int = 0
     description: str = ""
     labels: Dict[str, str] = field(default_factory=dict)
-    
-    def __post_init__(self):
-        self._lock = threading.Lock()
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
     
     def increment(self, amount: int = 1):
         """Increment counter by amount."""
@@ -66,60 +84,240 @@ class Counter:
     
     def get_value(self) -> int:
         """Get current counter value."""
-        with self._lock:
-            return self.value
+        # A single attribute read can't observe a half-applied update, so
+        # only the read-modify-write paths above need the lock
+        return self.value
+
+
+# Percentiles are estimated from log-linear slots rather than kept samples:
+# every power-of-two range is split into _HDR_SUB_BUCKETS equal slots, so a
+# slot's midpoint is within 1/(2 * _HDR_SUB_BUCKETS) (under 1%) of any
+# value in it. Slots are stored sparsely, so memory follows the spread of
+# the data, not the number of samples.
+_HDR_SUB_BUCKETS = 64
+_HDR_SCALE = 2 * _HDR_SUB_BUCKETS  # frexp mantissas span [0.5, 1)
+_HDR_NONPOSITIVE = -sys.maxsize  # slot for zero and negative values
+
+
+def _hdr_midpoint(index: int) -> float:
+    if index == _HDR_NONPOSITIVE:
+        return 0.0
+    exponent, sub_bucket = divmod(index, _HDR_SUB_BUCKETS)
+    return ldexp(0.5 + (sub_bucket + 0.5) / _HDR_SCALE, exponent)
+
+
+def _copy_counts(counts: Dict[int, int]) -> Dict[int, int]:
+    """Snapshot a cell's slot counts while its owner thread may be adding slots."""
+    while True:
+        try:
+            return dict(counts)
+        except RuntimeError:  # dictionary changed size during the copy
+            continue
+
+
+class _HistogramCell:
+    """One thread's share of a Histogram; only its owner thread writes it."""
+    __slots__ = ('owner', 'bucket_counts', 'sum_value', 'min_value', 'max_value', 'hdr_counts')
+    
+    def __init__(self, owner: Optional[threading.Thread], bucket_count: int):
+        self.owner = owner
+        self.bucket_counts = [0] * bucket_count
+        self.sum_value = 0.0
+        self.min_value = float('inf')
+        self.max_value = float('-inf')
+        self.hdr_counts: DefaultDict[int, int] = defaultdict(int)
+    
+    @property
+    def total_count(self) -> int:
+        # Every value lands in exactly one slot of bucket_counts
+        return sum(self.bucket_counts)
+    
+    def record(self, value: float, bucket: int):
+        self.bucket_counts[bucket] += 1
+        self.sum_value += value
+        if value < self.min_value:
+            self.min_value = value
+        if value > self.max_value:
+            self.max_value = value
+        if value > 0:
+            mantissa, exponent = frexp(value)
+            self.hdr_counts[exponent * _HDR_SUB_BUCKETS + int((mantissa - 0.5) * _HDR_SCALE)] += 1
+        else:
+            self.hdr_counts[_HDR_NONPOSITIVE] += 1
+    
+    def merge(self, other: '_HistogramCell'):
+        for i, count in enumerate(other.bucket_counts):
+            self.bucket_counts[i] += count
+        self.sum_value += other.sum_value
+        self.min_value = min(self.min_value, other.min_value)
+        self.max_value = max(self.max_value, other.max_value)
+        for index, count in _copy_counts(other.hdr_counts).items():
+            self.hdr_counts[index] += count
 
 
 @dataclass
 class Histogram:
-    """Thread-safe histogram for timing data."""
+    """Thread-safe histogram for timing data.
+    
+    Each thread records into its own cell, so observe() takes no lock and
+    threads never contend; readers add the cells up. Cells of threads that
+    have exited are folded into one retired cell when a new thread starts
+    observing, which keeps the cell list as long as the live thread count.
+    """
     name: str
     buckets: List[float] = field(default_factory=lambda: [0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 1000.0])
-    values: List[float] = field(default_factory=list)
     description: str = ""
     labels: Dict[str, str] = field(default_factory=dict)
     
     def __post_init__(self):
         self._lock = threading.Lock()
-        self.bucket_counts = [0] * len(self.buckets)
-        self.total_count = 0
-        self.sum_value = 0.0
+        self.buckets = sorted(self.buckets)
+        self._bucket_bounds = tuple(self.buckets)
+        # Prometheus le="..." label for each bucket, +Inf last
+        self._bucket_le_labels = tuple(f'le="{bucket}"' for bucket in self.buckets) + ('le="+Inf"',)
+        self.reset()
+    
+    def reset(self):
+        """Drop all observations."""
+        with self._lock:
+            self._local = threading.local()
+            self._retired = _HistogramCell(None, len(self.buckets) + 1)
+            self._cells: List[_HistogramCell] = [self._retired]
+    
+    def _new_cell(self) -> _HistogramCell:
+        cell = _HistogramCell(threading.current_thread(), len(self.buckets) + 1)
+        with self._lock:
+            cells = [self._retired]
+            for other in self._cells[1:]:
+                if other.owner.is_alive():
+                    cells.append(other)
+                else:
+                    self._retired.merge(other)
+            cells.append(cell)
+            self._cells = cells
+            local = self._local
+        local.cell = cell
+        return cell
     
     def observe(self, value: float):
         """Add a value to the histogram."""
-        with self._lock:
-            self.values.append(value)
-            self.total_count += 1
-            self.sum_value += value
-            
-            # Update bucket counts
-            for i, bucket in enumerate(self.buckets):
-                if value <= bucket:
-                    self.bucket_counts[i] += 1
+        try:
+            cell = self._local.cell
+        except AttributeError:
+            cell = self._new_cell()
+        # Same as cell.record(), inlined to save a call on the hottest path.
+        # Count only the lowest bucket the value fits in (the last slot is
+        # for values above every bound); bucket_counts makes it cumulative
+        cell.bucket_counts[bisect_left(self._bucket_bounds, value)] += 1
+        cell.sum_value += value
+        if value < cell.min_value:
+            cell.min_value = value
+        if value > cell.max_value:
+            cell.max_value = value
+        if value > 0:
+            mantissa, exponent = frexp(value)
+            cell.hdr_counts[exponent * _HDR_SUB_BUCKETS + int((mantissa - 0.5) * _HDR_SCALE)] += 1
+        else:
+            cell.hdr_counts[_HDR_NONPOSITIVE] += 1
+    
+    def observe_many(self, values: Iterable[float]):
+        """Add several values, resolving this thread's cell only once."""
+        try:
+            cell = self._local.cell
+        except AttributeError:
+            cell = self._new_cell()
+        bounds = self._bucket_bounds
+        record = cell.record
+        for value in values:
+            record(value, bisect_left(bounds, value))
+    
+    @property
+    def bucket_counts(self) -> List[int]:
+        """Cumulative count of values <= each bucket bound, as Prometheus expects."""
+        counts = [0] * (len(self.buckets) + 1)
+        for cell in self._cells:
+            for i, count in enumerate(cell.bucket_counts):
+                counts[i] += count
+        return list(accumulate(counts[:-1]))
+    
+    @property
+    def total_count(self) -> int:
+        return sum(cell.total_count for cell in self._cells)
+    
+    @property
+    def sum_value(self) -> float:
+        return sum(cell.sum_value for cell in self._cells)
     
     def get_percentile(self, percentile: float) -> float:
-        """Get percentile value."""
-        with self._lock:
-            if not self.values:
-                return 0.0
-            sorted_values = sorted(self.values)
-            index = int(len(sorted_values) * percentile / 100.0)
-            return sorted_values[min(index, len(sorted_values) - 1)]
+        """Get percentile value (estimated to within 1%)."""
+        return self.get_percentiles([percentile])[0]
+    
+    def get_percentiles(self, percentiles: List[float]) -> List[float]:
+        """Get several percentile values from one pass over the slots."""
+        # Live cells keep changing while we read them, so work from copies
+        # and take the total from the copied slots: bucket_counts may
+        # already include values whose slot the copy missed
+        hdr_counts: DefaultDict[int, int] = defaultdict(int)
+        min_value = float('inf')
+        max_value = float('-inf')
+        for cell in self._cells:
+            min_value = min(min_value, cell.min_value)
+            max_value = max(max_value, cell.max_value)
+            for index, count in _copy_counts(cell.hdr_counts).items():
+                hdr_counts[index] += count
+        total = sum(hdr_counts.values())
+        if not total:
+            return [0.0] * len(percentiles)
+        # Rank of each requested percentile among the sorted samples
+        targets = sorted((min(int(total * p / 100.0), total - 1), i) for i, p in enumerate(percentiles))
+        results = [max_value] * len(percentiles)
+        slots = iter(sorted(hdr_counts.items()))
+        seen = 0
+        for rank, i in targets:
+            while seen <= rank:
+                slot = next(slots, None)
+                if slot is None:
+                    break
+                index, count = slot
+                seen += count
+            if seen <= rank:
+                break  # out of slots; the remaining ranks keep max_value
+            # Slots at the edges are clamped to the exact extremes
+            results[i] = min(max(_hdr_midpoint(index), min_value), max_value)
+        return results
     
     def get_average(self) -> float:
         """Get average value."""
-        with self._lock:
-            return self.sum_value / self.total_count if self.total_count > 0 else 0.0
+        total_count = self.total_count
+        return self.sum_value / total_count if total_count > 0 else 0.0
+
+
+# Innermost operation being timed in the current thread or asyncio task
+_current_operation: ContextVar[Optional[OperationMetrics]] = ContextVar('current_operation', default=None)
 
 
 class PerformanceMonitor:
     """Main performance monitoring class."""
     
-    def __init__(self, enable_logging: bool = True, log_level: str = "INFO"):
+    # How many finished operations get_operation_stats() looks back over
+    COMPLETED_OPERATIONS_CAPACITY = 1000
+    # Seconds a built metrics summary is served before being rebuilt
+    SUMMARY_CACHE_TTL = 0.1
+    
+    def __init__(self, enable_logging: bool = True, log_level: str = "INFO",
+                 enable_metrics_collection: bool = True):
         self.counters: Dict[str, Counter] = {}
         self.histograms: Dict[str, Histogram] = {}
-        self.active_operations: Dict[str, OperationMetrics] = {}
-        self.completed_operations: deque = deque(maxlen=1000)  # Keep last 1000 operations
+        self.active_operations: Dict[int, OperationMetrics] = {}
+        # Ring buffer of the last finished operations, one column per field;
+        # _op_head counts every operation ever recorded
+        capacity = self.COMPLETED_OPERATIONS_CAPACITY
+        self._op_names: List[Optional[str]] = [None] * capacity
+        self._op_durations = array('d', [0.0]) * capacity
+        self._op_success = bytearray(capacity)
+        self._op_head = 0
+        self._next_operation_id = itertools.count().__next__
+        self._summary_cache: Optional[Tuple[float, Dict[str, Any]]] = None
         self._lock = threading.Lock()
         
         # Configure logging
@@ -138,8 +336,8 @@ class PerformanceMonitor:
             handler.setFormatter(formatter)
             self.logger.addHandler(handler)
         
-        # Metrics collection state
-        self._metrics_collection_enabled = True
+        # Metrics collection state; when off, recording calls return at once
+        self._metrics_collection_enabled = enable_metrics_collection
         self._start_time = time.time()
         
         # Initialize common counters
@@ -160,6 +358,11 @@ class PerformanceMonitor:
     
     def register_counter(self, name: str, description: str = "", labels: Optional[Dict[str, str]] = None) -> Counter:
         """Register a new counter."""
+        # Metrics are registered once and never removed, so an existing one
+        # can be returned without the lock; only insertion needs it
+        counter = self.counters.get(name)
+        if counter is not None:
+            return counter
         with self._lock:
             if name not in self.counters:
                 self.counters[name] = Counter(name, description=description, labels=labels or {})
@@ -167,6 +370,9 @@ class PerformanceMonitor:
     
     def register_histogram(self, name: str, description: str = "", buckets: Optional[List[float]] = None, labels: Optional[Dict[str, str]] = None) -> Histogram:
         """Register a new histogram."""
+        histogram = self.histograms.get(name)
+        if histogram is not None:
+            return histogram
         with self._lock:
             if name not in self.histograms:
                 self.histograms[name] = Histogram(name, buckets=buckets or [], description=description, labels=labels or {})
@@ -180,39 +386,53 @@ class PerformanceMonitor:
         """Get a histogram by name."""
         return self.histograms.get(name)
     
-    def increment_counter(self, name: str, amount: int = 1, labels: Optional[Dict[str, str]] = None):
+    def increment_counter(self, name: str, amount: int = 1):
         """Increment a counter."""
-        counter = self.get_counter(name)
-        if counter:
+        if not self._metrics_collection_enabled:
+            return
+        counter = self.counters.get(name)
+        if counter is not None:
             counter.increment(amount)
-            if self.enable_logging:
-                self.logger.debug(f"Counter {name} incremented by {amount}, new value: {counter.get_value()}")
+            # Checked first so nothing is formatted unless DEBUG is on
+            if self.enable_logging and self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Counter %s incremented by %s, new value: %s", name, amount, counter.get_value())
     
     def observe_histogram(self, name: str, value: float, labels: Optional[Dict[str, str]] = None):
         """Add a value to a histogram."""
+        if not self._metrics_collection_enabled:
+            return
         histogram = self.get_histogram(name)
         if histogram:
             histogram.observe(value)
-            if self.enable_logging:
-                self.logger.debug(f"Histogram {name} observed value: {value}")
+            if self.enable_logging and self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Histogram %s observed value: %s", name, value)
     
     @contextmanager
     def time_operation(self, operation_name: str, **metadata):
         """Context manager for timing operations."""
-        operation_id = f"{operation_name}_{int(time.time() * 1000000)}"
-        operation = OperationMetrics(operation_name, time.time(), metadata=metadata)
+        if not self._metrics_collection_enabled:
+            # Callers may still attach metadata to the yielded operation
+            yield OperationMetrics(operation_name, time.time(), metadata=metadata)
+            return
         
-        with self._lock:
-            self.active_operations[operation_id] = operation
+        # Ids come from a shared counter, so they are unique without
+        # formatting a string; a single dict store needs no lock
+        operation_id = self._next_operation_id()
+        operation = OperationMetrics(operation_name, time.time(), metadata=metadata)
+        active_operations = self.active_operations
+        active_operations[operation_id] = operation
+        # Timed blocks nest as a per-context stack: remember the enclosing
+        # operation and restore it on exit
+        parent = _current_operation.get()
+        _current_operation.set(operation)
         
         try:
             yield operation
             operation.finish(success=True)
+            duration = operation.duration_ms
             
             # Log successful operation
-            if self.enable_logging:
-                # Safely get duration_ms after finish() is called
-                duration = getattr(operation, 'duration_ms', 0) or 0
+            if self.enable_logging and self.logger.isEnabledFor(logging.INFO):
                 self.logger.info(
                     f"Operation completed successfully",
                     extra={
@@ -223,7 +443,6 @@ class PerformanceMonitor:
                 )
             
             # Update metrics
-            duration = getattr(operation, 'duration_ms', 0) or 0
             self.observe_histogram(f"{operation_name}_duration_ms", duration)
             self.increment_counter(f"{operation_name}_operations_total")
             
@@ -232,13 +451,11 @@ class PerformanceMonitor:
             
             # Log failed operation
             if self.enable_logging:
-                # Safely get duration_ms after finish() is called
-                duration = getattr(operation, 'duration_ms', 0) or 0
                 self.logger.error(
                     f"Operation failed",
                     extra={
                         "operation_name": operation_name,
-                        "duration_ms": duration,
+                        "duration_ms": operation.duration_ms,
                         "error_message": str(e),
                         "metadata": metadata
                     },
@@ -250,20 +467,39 @@ class PerformanceMonitor:
             raise
         
         finally:
+            _current_operation.set(parent)
             with self._lock:
-                if operation_id in self.active_operations:
-                    del self.active_operations[operation_id]
-                self.completed_operations.append(operation)
+                active_operations.pop(operation_id, None)
+                self._record_completed(operation)
+    
+    def current_operation(self) -> Optional[OperationMetrics]:
+        """Innermost time_operation() block open in the calling thread or task.
+        
+        Lets code deep in a timed call attach metadata without the operation
+        being passed down to it.
+        """
+        return _current_operation.get()
+    
+    def _record_completed(self, operation: OperationMetrics):
+        """Store a finished operation in the ring buffer; call with the lock held."""
+        slot = self._op_head % self.COMPLETED_OPERATIONS_CAPACITY
+        self._op_names[slot] = operation.operation_name
+        self._op_durations[slot] = operation.duration_ms or 0.0
+        self._op_success[slot] = operation.success
+        self._op_head += 1
     
-    def start_operation(self, operation_name: str, **metadata) -> str:
-        """Start a new operation and return its ID."""
-        operation_id = f"{operation_name}_{int(time.time() * 1000000)}"
+    def start_operation(self, operation_name: str, **metadata) -> int:
+        """Start a new operation and return its ID (an opaque int)."""
+        operation_id = self._next_operation_id()
+        if not self._metrics_collection_enabled:
+            # Never registered, so finish_operation() ignores the id
+            return operation_id
         operation = OperationMetrics(operation_name, time.time(), metadata=metadata)
         
         with self._lock:
             self.active_operations[operation_id] = operation
         
-        if self.enable_logging:
+        if self.enable_logging and self.logger.isEnabledFor(logging.INFO):
             self.logger.info(
                 f"Operation started",
                 extra={
@@ -275,7 +511,7 @@ class PerformanceMonitor:
         
         return operation_id
     
-    def finish_operation(self, operation_id: str, success: bool = True, error_message: Optional[str] = None, **metadata):
+    def finish_operation(self, operation_id: int, success: bool = True, error_message: Optional[str] = None, **metadata):
         """Finish an operation by ID."""
         with self._lock:
             operation = self.active_operations.get(operation_id)
@@ -284,12 +520,11 @@ class PerformanceMonitor:
             
             operation.finish(success=success, error_message=error_message, **metadata)
             del self.active_operations[operation_id]
-            self.completed_operations.append(operation)
+            self._record_completed(operation)
+        duration = operation.duration_ms
         
         # Log operation completion
-        if self.enable_logging:
-            # Safely get duration_ms
-            duration = getattr(operation, 'duration_ms', 0) or 0
+        if self.enable_logging and self.logger.isEnabledFor(logging.INFO if success else logging.ERROR):
             if success:
                 self.logger.info(
                     f"Operation completed successfully",
@@ -313,7 +548,6 @@ class PerformanceMonitor:
                 )
         
         # Update metrics
-        duration = getattr(operation, 'duration_ms', 0) or 0
         self.observe_histogram(f"{operation.operation_name}_duration_ms", duration)
         if success:
             self.increment_counter(f"{operation.operation_name}_operations_total")
@@ -329,7 +563,16 @@ class PerformanceMonitor:
         log_method(message, extra=extra_data)
     
     def get_metrics_summary(self) -> Dict[str, Any]:
-        """Get a summary of all metrics."""
+        """Get a summary of all metrics.
+        
+        Summaries are reused for SUMMARY_CACHE_TTL seconds, so callers that
+        poll in a burst (exporters, status tools) build it only once; treat
+        the returned dict as read-only.
+        """
+        cached = self._summary_cache
+        if cached is not None and time.perf_counter() - cached[0] < self.SUMMARY_CACHE_TTL:
+            return cached[1]
+        
         with self._lock:
             counter_data = {}
             for name, counter in self.counters.items():
@@ -341,23 +584,27 @@ class PerformanceMonitor:
             
             histogram_data = {}
             for name, histogram in self.histograms.items():
+                total_count = histogram.total_count
+                sum_value = histogram.sum_value
+                p50, p95, p99 = histogram.get_percentiles([50, 95, 99])
                 histogram_data[name] = {
-                    "count": histogram.total_count,
-                    "sum": histogram.sum_value,
-                    "average": histogram.get_average(),
-                    "p50": histogram.get_percentile(50),
-                    "p95": histogram.get_percentile(95),
-                    "p99": histogram.get_percentile(99),
+                    "count": total_count,
+                    "sum": sum_value,
+                    "average": sum_value / total_count if total_count > 0 else 0.0,
+                    "p50": p50,
+                    "p95": p95,
+                    "p99": p99,
                     "description": histogram.description,
                     "labels": histogram.labels
                 }
             
             active_ops = len(self.active_operations)
-            completed_ops = len(self.completed_operations)
+            completed_ops = min(self._op_head, self.COMPLETED_OPERATIONS_CAPACITY)
             
-            return {
-                "timestamp": datetime.now().isoformat(),
-                "uptime_seconds": time.time() - self._start_time,
+            now = time.time()
+            summary = {
+                "timestamp": datetime.fromtimestamp(now).isoformat(),
+                "uptime_seconds": now - self._start_time,
                 "counters": counter_data,
                 "histograms": histogram_data,
                 "operations": {
@@ -365,65 +612,75 @@ class PerformanceMonitor:
                     "completed": completed_ops
                 }
             }
+            self._summary_cache = (time.perf_counter(), summary)
+            return summary
     
-    def export_metrics_json(self, file_path: Optional[str] = None) -> str:
-        """Export metrics to JSON format."""
+    def export_metrics_json(self, file_path: Optional[str] = None, compact: bool = True) -> str:
+        """Export metrics to JSON format; pass compact=False for indented output."""
         metrics = self.get_metrics_summary()
-        json_data = json.dumps(metrics, indent=2)
+        if orjson is not None:
+            json_data = orjson.dumps(metrics, option=0 if compact else orjson.OPT_INDENT_2)
+        elif compact:
+            json_data = json.dumps(metrics, separators=(',', ':')).encode('utf-8')
+        else:
+            json_data = json.dumps(metrics, indent=2).encode('utf-8')
         
         if file_path:
-            with open(file_path, 'w') as f:
+            with open(file_path, 'wb') as f:
                 f.write(json_data)
-            self.logger.info(f"Metrics exported to {file_path}")
+            self.logger.info("Metrics exported to %s", file_path)
         
-        return json_data
+        return json_data.decode('utf-8')
     
     def export_metrics_prometheus(self) -> str:
         """Export metrics in Prometheus format."""
+        # Each entry is one or more newline-joined lines, so a metric's
+        # fixed lines cost a single format and append
         lines = []
         
         # Add metadata
-        lines.append(f"# HELP performance_monitor_uptime_seconds Uptime of the performance monitor")
-        lines.append(f"# TYPE performance_monitor_uptime_seconds gauge")
-        lines.append(f"performance_monitor_uptime_seconds {time.time() - self._start_time}")
-        lines.append("")
+        lines.append(
+            "# HELP performance_monitor_uptime_seconds Uptime of the performance monitor\n"
+            "# TYPE performance_monitor_uptime_seconds gauge\n"
+            f"performance_monitor_uptime_seconds {time.time() - self._start_time}\n"
+        )
         
         # Export counters
         for name, counter in self.counters.items():
-            lines.append(f"# HELP {name} {counter.description}")
-            lines.append(f"# TYPE {name} counter")
-            
             labels_str = ""
             if counter.labels:
                 label_parts = [f'{k}="{v}"' for k, v in counter.labels.items()]
                 labels_str = "{" + ",".join(label_parts) + "}"
             
-            lines.append(f"{name}{labels_str} {counter.get_value()}")
-            lines.append("")
+            lines.append(
+                f"# HELP {name} {counter.description}\n"
+                f"# TYPE {name} counter\n"
+                f"{name}{labels_str} {counter.get_value()}\n"
+            )
         
         # Export histograms
         for name, histogram in self.histograms.items():
-            lines.append(f"# HELP {name} {histogram.description}")
-            lines.append(f"# TYPE {name} histogram")
+            lines.append(f"# HELP {name} {histogram.description}\n# TYPE {name} histogram")
             
             labels_str = ""
+            label_prefix = ""
             if histogram.labels:
-                label_parts = [f'{k}="{v}"' for k, v in histogram.labels.items()]
-                labels_str = "{" + ",".join(label_parts) + "}"
-            
-            # Export bucket counts
-            for i, bucket in enumerate(histogram.buckets):
-                bucket_labels = labels_str.rstrip("}") + f',le="{bucket}"' + "}" if labels_str else f'{{le="{bucket}"}}'
-                lines.append(f"{name}_bucket{bucket_labels} {histogram.bucket_counts[i]}")
+                label_prefix = ",".join(f'{k}="{v}"' for k, v in histogram.labels.items()) + ","
+                labels_str = "{" + label_prefix[:-1] + "}"
             
-            # Export +Inf bucket
-            inf_labels = labels_str.rstrip("}") + ',le="+Inf"' + "}" if labels_str else '{le="+Inf"}'
-            lines.append(f"{name}_bucket{inf_labels} {histogram.total_count}")
+            # Export bucket counts, +Inf last; read the cells only once
+            total_count = histogram.total_count
+            counts = histogram.bucket_counts + [total_count]
+            lines.extend(
+                f"{name}_bucket{{{label_prefix}{le_label}}} {count}"
+                for le_label, count in zip(histogram._bucket_le_labels, counts)
+            )
             
             # Export sum and count
-            lines.append(f"{name}_sum{labels_str} {histogram.sum_value}")
-            lines.append(f"{name}_count{labels_str} {histogram.total_count}")
-            lines.append("")
+            lines.append(
+                f"{name}_sum{labels_str} {histogram.sum_value}\n"
+                f"{name}_count{labels_str} {total_count}\n"
+            )
         
         return "\n".join(lines)
     
@@ -434,81 +691,87 @@ class PerformanceMonitor:
                 counter.reset()
             
             for histogram in self.histograms.values():
-                histogram.values.clear()
-                histogram.bucket_counts = [0] * len(histogram.buckets)
-                histogram.total_count = 0
-                histogram.sum_value = 0.0
+                histogram.reset()
             
             self.active_operations.clear()
-            self.completed_operations.clear()
+            self._op_names = [None] * self.COMPLETED_OPERATIONS_CAPACITY
+            self._op_head = 0
+            self._summary_cache = None
         
         self.logger.info("All metrics have been reset")
     
     def get_operation_stats(self) -> Dict[str, Any]:
         """Get statistics about operations."""
         with self._lock:
-            completed = list(self.completed_operations)
-            active = list(self.active_operations.values())
+            completed = min(self._op_head, self.COMPLETED_OPERATIONS_CAPACITY)
+            names = self._op_names[:completed]
+            durations = self._op_durations[:completed]
+            successes = bytes(self._op_success[:completed])
+            active = len(self.active_operations)
         
-        # Group by operation name
-        operation_stats = defaultdict(lambda: {
-            "total_count": 0,
-            "success_count": 0,
-            "error_count": 0,
-            "total_duration_ms": 0.0,
-            "avg_duration_ms": 0.0,
-            "min_duration_ms": float('inf'),
-            "max_duration_ms": 0.0
-        })
+        # Group the columns by operation name, then reduce each group with
+        # the builtins instead of updating a stats dict per operation
+        durations_by_name: Dict[str, List[float]] = defaultdict(list)
+        errors_by_name: Dict[str, int] = defaultdict(int)
+        for name, duration, success in zip(names, durations, successes):
+            durations_by_name[name].append(duration)
+            if not success:
+                errors_by_name[name] += 1
         
-        for op in completed:
-            stats = operation_stats[op.operation_name]
-            stats["total_count"] += 1
-            
-            if op.success:
-                stats["success_count"] += 1
-            else:
-                stats["error_count"] += 1
-            
-            if op.duration_ms is not None:
-                stats["total_duration_ms"] += op.duration_ms
-                stats["min_duration_ms"] = min(stats["min_duration_ms"], op.duration_ms)
-                stats["max_duration_ms"] = max(stats["max_duration_ms"], op.duration_ms)
-        
-        # Calculate averages
-        for stats in operation_stats.values():
-            if stats["total_count"] > 0:
-                stats["avg_duration_ms"] = stats["total_duration_ms"] / stats["total_count"]
-                if stats["min_duration_ms"] == float('inf'):
-                    stats["min_duration_ms"] = 0.0
+        operation_stats = {}
+        for name, op_durations in durations_by_name.items():
+            total_count = len(op_durations)
+            total_duration = sum(op_durations)
+            error_count = errors_by_name.get(name, 0)
+            operation_stats[name] = {
+                "total_count": total_count,
+                "success_count": total_count - error_count,
+                "error_count": error_count,
+                "total_duration_ms": total_duration,
+                "avg_duration_ms": total_duration / total_count,
+                "min_duration_ms": min(op_durations),
+                "max_duration_ms": max(op_durations)
+            }
         
         return {
-            "active_operations": len(active),
-            "completed_operations": len(completed),
-            "operation_stats": dict(operation_stats)
+            "active_operations": active,
+            "completed_operations": completed,
+            "operation_stats": operation_stats
         }
 
 
-# Global performance monitor instance
+# Global performance monitor instance, created on first use. Hot call sites
+# can bind it once with `from .performance_monitor import monitor` instead of
+# calling get_performance_monitor() per emission.
 _performance_monitor: Optional[PerformanceMonitor] = None
 
 
 def get_performance_monitor() -> PerformanceMonitor:
     """Get the global performance monitor instance."""
-    global _performance_monitor
+    global _performance_monitor, monitor
     if _performance_monitor is None:
-        _performance_monitor = PerformanceMonitor()
+        _performance_monitor = monitor = PerformanceMonitor()
     return _performance_monitor
 
 
+def __getattr__(name: str) -> Any:
+    # Only reached until get_performance_monitor() binds `monitor` as a
+    # plain module attribute; importing the module alone creates nothing
+    if name == "monitor":
+        return get_performance_monitor()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def create_performance_monitor_from_config(config: Dict[str, Any]) -> PerformanceMonitor:
     """Create a performance monitor from configuration."""
     monitoring_config = config.get("performance_monitoring", {})
     
     enable_logging = monitoring_config.get("enable_logging", True)
     log_level = monitoring_config.get("log_level", "INFO")
+    enable_metrics_collection = monitoring_config.get("enable_metrics_collection", True)
     
-    monitor = PerformanceMonitor(enable_logging=enable_logging, log_level=log_level)
+    monitor = PerformanceMonitor(enable_logging=enable_logging, log_level=log_level,
+                                 enable_metrics_collection=enable_metrics_collection)
     
     # Configure custom counters if specified
     custom_counters = monitoring_config.get("custom_counters", [])
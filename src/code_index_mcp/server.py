@@ -2263,7 +2263,8 @@ async def _index_project_with_progress(base_path: str, progress_tracker: Progres
                     directory_path=base_path,
                     files=[file_path],
                     task_id=file_path,
-                    metadata={"extension": ext}
+                    metadata={"extension": ext},
+                    cancellation_token=progress_tracker.cancellation_token
                 )
                 indexing_tasks.append(task)
             
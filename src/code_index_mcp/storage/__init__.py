@@ -6,7 +6,7 @@ including Trie-based file indexing and SQLite-based content caching.
 """
 
 from .trie_index import TrieFileIndex
-from .sqlite_storage import SQLiteStorage, SQLiteFileIndex
+from .sqlite_storage import SQLiteStorage, SQLiteFileIndex, open_shared_connection
 from .storage_interface import StorageInterface
 
-__all__ = ['TrieFileIndex', 'SQLiteStorage', 'SQLiteFileIndex', 'StorageInterface']
+__all__ = ['TrieFileIndex', 'SQLiteStorage', 'SQLiteFileIndex', 'StorageInterface', 'open_shared_connection']
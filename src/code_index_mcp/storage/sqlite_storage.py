@@ -6,26 +6,107 @@ key-value storage and full-text search capabilities.
 """
 
 import sqlite3
+import logging
 import json
 import os
-import fnmatch
-from typing import Any, Dict, Optional, List, Tuple, Iterator
+import threading
+from typing import Any, Dict, Optional, List, Tuple, Iterable, Iterator
 from pathlib import Path
 from .storage_interface import StorageInterface, FileIndexInterface
 
+logger = logging.getLogger(__name__)
+
+
+# The trigram tokenizer (SQLite 3.34+) indexes every 3-character substring,
+# so MATCH and LIKE '%...%' can find text anywhere inside a value instead of
+# only at token boundaries.
+FTS_TOKENIZE = ", tokenize='trigram'" if sqlite3.sqlite_version_info >= (3, 34, 0) else ""
+
+
+class SharedConnection:
+    """Per-thread connections to one database, shared by several tables.
+    
+    A sqlite3 connection holds a single transaction, so it must not be used
+    by two threads at once: one thread's commit or rollback would end the
+    other's transaction. Each thread therefore gets its own connection,
+    opened on first use and reused by every table on that thread.
+    """
+    
+    def __init__(self, db_path: str, cache_size_kb: int = 65536):
+        self.db_path = db_path
+        self.cache_size_kb = cache_size_kb
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        self._closed = False
+    
+    def get(self) -> sqlite3.Connection:
+        """Return the calling thread's connection, opening it if needed."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
+        with self._lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+            # check_same_thread=False only so close() can run on any thread
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute('PRAGMA page_size=8192')
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA temp_store=MEMORY')
+            conn.execute(f'PRAGMA cache_size=-{int(self.cache_size_kb)}')
+            self._connections.append(conn)
+        self._local.conn = conn
+        return conn
+    
+    def close(self) -> None:
+        """Close every thread's connection."""
+        with self._lock:
+            self._closed = True
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+
+
+def open_shared_connection(db_path: str, cache_size_kb: int = 65536) -> SharedConnection:
+    """Open a connection that several SQLiteStorage tables can share.
+    
+    Args:
+        db_path: Path to SQLite database file
+        cache_size_kb: Upper bound for each thread's page cache
+        
+    Returns:
+        A SharedConnection handing each thread its own sqlite3 connection
+    """
+    db_dir = os.path.dirname(db_path)
+    if db_dir:
+        os.makedirs(db_dir, exist_ok=True)
+    return SharedConnection(db_path, cache_size_kb)
+
 
 class SQLiteStorage(StorageInterface):
     """SQLite-based key-value storage with FTS support."""
     
-    def __init__(self, db_path: str, enable_fts: bool = True):
+    def __init__(self, db_path: str, enable_fts: bool = True, table: str = 'kv_store',
+                 connection: Optional[SharedConnection] = None):
         """Initialize SQLite storage.
         
         Args:
             db_path: Path to SQLite database file
             enable_fts: Whether to enable Full-Text Search
+            table: Name of the key-value table, so several storages can live
+                in one database
+            connection: Shared connection from open_shared_connection(); by
+                default a connection is opened per operation
         """
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name: {table!r}")
         self.db_path = db_path
         self.enable_fts = enable_fts
+        self._table = table
+        # The default table keeps its original FTS table name
+        self._fts_table = 'kv_fts' if table == 'kv_store' else f'{table}_fts'
+        self._connection = connection
         self._ensure_db_directory()
         self._init_db()
     
@@ -35,32 +116,81 @@ class SQLiteStorage(StorageInterface):
         if db_dir and not os.path.exists(db_dir):
             os.makedirs(db_dir, exist_ok=True)
     
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection tuned for batched writes."""
+        if self._connection is not None:
+            return self._connection.get()
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        return conn
+    
     def _init_db(self):
         """Initialize the database schema."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
+            # Only takes effect on a new database, so it must precede WAL
+            # mode and the first CREATE TABLE
+            conn.execute('PRAGMA page_size=8192')
+            # WAL mode is persistent, so setting it once here covers every connection
+            conn.execute('PRAGMA journal_mode=WAL')
+            
+            # Without FTS nothing needs kv_store's rowid, so store rows
+            # clustered on the key: a lookup is one B-tree seek instead of
+            # the key index followed by the rowid table.
+            without_rowid = '' if self.enable_fts else ' WITHOUT ROWID'
+            row = conn.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (self._table,)
+            ).fetchone()
+            migrate = row is not None and without_rowid and 'WITHOUT ROWID' not in row[0].upper()
+            if migrate:
+                conn.execute(f'ALTER TABLE {self._table} RENAME TO {self._table}_old')
+            
             # Create main key-value table
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS kv_store (
+            conn.execute(f'''
+                CREATE TABLE IF NOT EXISTS {self._table} (
                     key TEXT PRIMARY KEY,
                     value BLOB,
                     value_type TEXT,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
+                ){without_rowid}
             ''')
             
+            if migrate:
+                conn.execute(f'''
+                    INSERT INTO {self._table} (key, value, value_type, created_at, updated_at)
+                    SELECT key, value, value_type, created_at, updated_at FROM {self._table}_old
+                ''')
+                conn.execute(f'DROP TABLE {self._table}_old')
+            
             # Create FTS table if enabled
             if self.enable_fts:
-                conn.execute('''
-                    CREATE VIRTUAL TABLE IF NOT EXISTS kv_fts USING fts5(
-                        key, value_text, content='kv_store', content_rowid='rowid'
+                # Databases created before the trigram tokenizer was used
+                # get their FTS table rebuilt from kv_store.
+                row = conn.execute(
+                    "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (self._fts_table,)
+                ).fetchone()
+                rebuild = row is not None and FTS_TOKENIZE and 'trigram' not in row[0]
+                if rebuild:
+                    conn.execute(f'DROP TABLE {self._fts_table}')
+                
+                conn.execute(f'''
+                    CREATE VIRTUAL TABLE IF NOT EXISTS {self._fts_table} USING fts5(
+                        key, value_text, content='{self._table}', content_rowid='rowid'{FTS_TOKENIZE}
                     )
                 ''')
                 
+                if rebuild:
+                    conn.execute(f'''
+                        INSERT INTO {self._fts_table}(rowid, key, value_text)
+                        SELECT rowid, key, CASE WHEN value_type = 'text' THEN value ELSE '' END
+                        FROM {self._table}
+                    ''')
+                
                 # Create triggers to maintain FTS index
-                conn.execute('''
-                    CREATE TRIGGER IF NOT EXISTS kv_store_ai AFTER INSERT ON kv_store BEGIN
-                        INSERT INTO kv_fts(rowid, key, value_text) 
+                conn.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS {self._table}_ai AFTER INSERT ON {self._table} BEGIN
+                        INSERT INTO {self._fts_table}(rowid, key, value_text) 
                         VALUES (new.rowid, new.key, CASE 
                             WHEN new.value_type = 'text' THEN new.value
                             ELSE ''
@@ -68,9 +198,9 @@ class SQLiteStorage(StorageInterface):
                     END
                 ''')
                 
-                conn.execute('''
-                    CREATE TRIGGER IF NOT EXISTS kv_store_ad AFTER DELETE ON kv_store BEGIN
-                        INSERT INTO kv_fts(kv_fts, rowid, key, value_text) 
+                conn.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS {self._table}_ad AFTER DELETE ON {self._table} BEGIN
+                        INSERT INTO {self._fts_table}({self._fts_table}, rowid, key, value_text) 
                         VALUES ('delete', old.rowid, old.key, CASE 
                             WHEN old.value_type = 'text' THEN old.value
                             ELSE ''
@@ -78,14 +208,14 @@ class SQLiteStorage(StorageInterface):
                     END
                 ''')
                 
-                conn.execute('''
-                    CREATE TRIGGER IF NOT EXISTS kv_store_au AFTER UPDATE ON kv_store BEGIN
-                        INSERT INTO kv_fts(kv_fts, rowid, key, value_text) 
+                conn.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS {self._table}_au AFTER UPDATE ON {self._table} BEGIN
+                        INSERT INTO {self._fts_table}({self._fts_table}, rowid, key, value_text) 
                         VALUES ('delete', old.rowid, old.key, CASE 
                             WHEN old.value_type = 'text' THEN old.value
                             ELSE ''
                         END);
-                        INSERT INTO kv_fts(rowid, key, value_text) 
+                        INSERT INTO {self._fts_table}(rowid, key, value_text) 
                         VALUES (new.rowid, new.key, CASE 
                             WHEN new.value_type = 'text' THEN new.value
                             ELSE ''
@@ -124,34 +254,67 @@ class SQLiteStorage(StorageInterface):
 
             conn.commit()
     
+    @staticmethod
+    def _encode_value(value: Any) -> Tuple[bytes, str]:
+        """Encode a value into its stored blob and type tag."""
+        if isinstance(value, str):
+            return value.encode('utf-8'), 'text'
+        return json.dumps(value).encode('utf-8'), 'json'
+    
+    @staticmethod
+    def _decode_value(value_blob: bytes, value_type: str) -> Any:
+        """Decode a stored blob back into its value."""
+        if value_type == 'text':
+            return value_blob.decode('utf-8')
+        return json.loads(value_blob.decode('utf-8'))
+    
+    @staticmethod
+    def _glob_pattern(pattern: str) -> str:
+        """Translate an fnmatch pattern into SQLite GLOB syntax.
+        
+        Both support *, ? and [...] classes; only class negation is spelled
+        differently ([!...] vs [^...]).
+        """
+        return pattern.replace('[!', '[^')
+    
     def put(self, key: str, value: Any) -> bool:
         """Store a key-value pair."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                if isinstance(value, str):
-                    value_blob = value.encode('utf-8')
-                    value_type = 'text'
-                else:
-                    value_blob = json.dumps(value).encode('utf-8')
-                    value_type = 'json'
+            with self._connect() as conn:
+                value_blob, value_type = self._encode_value(value)
                 
-                conn.execute('''
-                    INSERT OR REPLACE INTO kv_store (key, value, value_type, updated_at)
+                conn.execute(f'''
+                    INSERT OR REPLACE INTO {self._table} (key, value, value_type, updated_at)
                     VALUES (?, ?, ?, CURRENT_TIMESTAMP)
                 ''', (key, value_blob, value_type))
                 
                 conn.commit()
                 return True
         except Exception as e:
-            print(f"Error storing key {key}: {e}")
+            logger.error("Error storing key %s: %s", key, e)
+            return False
+    
+    def put_many(self, items: Iterable[Tuple[str, Any]]) -> bool:
+        """Store many key-value pairs in a single transaction."""
+        try:
+            with self._connect() as conn:
+                conn.executemany(f'''
+                    INSERT OR REPLACE INTO {self._table} (key, value, value_type, updated_at)
+                    VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                ''', ((key, *self._encode_value(value)) for key, value in items))
+                
+                conn.commit()
+                return True
+        except Exception as e:
+            logger.error("Error storing items: %s", e)
             return False
     
     def get(self, key: str) -> Optional[Any]:
         """Retrieve a value by key."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.execute(
-                    'SELECT value, value_type FROM kv_store WHERE key = ?',
+                    f'SELECT value, value_type FROM {self._table} WHERE key = ?',
                     (key,)
                 )
                 row = cursor.fetchone()
@@ -159,116 +322,129 @@ class SQLiteStorage(StorageInterface):
                 if row is None:
                     return None
                 
-                value_blob, value_type = row
-                if value_type == 'text':
-                    return value_blob.decode('utf-8')
-                else:
-                    return json.loads(value_blob.decode('utf-8'))
+                return self._decode_value(*row)
                     
         except Exception as e:
-            print(f"Error retrieving key {key}: {e}")
+            logger.error("Error retrieving key %s: %s", key, e)
             return None
     
     def delete(self, key: str) -> bool:
         """Delete a key-value pair."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute('DELETE FROM kv_store WHERE key = ?', (key,))
+            with self._connect() as conn:
+                cursor = conn.execute(f'DELETE FROM {self._table} WHERE key = ?', (key,))
                 conn.commit()
                 return cursor.rowcount > 0
         except Exception as e:
-            print(f"Error deleting key {key}: {e}")
+            logger.error("Error deleting key %s: %s", key, e)
             return False
     
     def exists(self, key: str) -> bool:
         """Check if a key exists."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.execute(
-                    'SELECT 1 FROM kv_store WHERE key = ? LIMIT 1',
+                    f'SELECT 1 FROM {self._table} WHERE key = ? LIMIT 1',
                     (key,)
                 )
                 return cursor.fetchone() is not None
         except Exception as e:
-            print(f"Error checking key existence {key}: {e}")
+            logger.error("Error checking key existence %s: %s", key, e)
             return False
     
     def keys(self, pattern: Optional[str] = None) -> Iterator[str]:
         """Iterate over keys, optionally filtered by pattern."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 if pattern:
-                    cursor = conn.execute('SELECT key FROM kv_store ORDER BY key')
+                    # GLOB is evaluated by SQLite against the key index, so
+                    # non-matching keys are never materialized in Python
+                    cursor = conn.execute(
+                        f'SELECT key FROM {self._table} WHERE key GLOB ? ORDER BY key',
+                        (self._glob_pattern(pattern),)
+                    )
                     for row in cursor:
-                        key = row[0]
-                        if fnmatch.fnmatch(key, pattern):
-                            yield key
+                        yield row[0]
                 else:
-                    cursor = conn.execute('SELECT key FROM kv_store ORDER BY key')
+                    cursor = conn.execute(f'SELECT key FROM {self._table} ORDER BY key')
                     for row in cursor:
                         yield row[0]
         except Exception as e:
-            print(f"Error iterating keys: {e}")
+            logger.error("Error iterating keys: %s", e)
     
     def items(self, pattern: Optional[str] = None) -> Iterator[Tuple[str, Any]]:
         """Iterate over key-value pairs, optionally filtered by pattern."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute('SELECT key, value, value_type FROM kv_store ORDER BY key')
-                for row in cursor:
-                    key, value_blob, value_type = row
-                    if pattern and not fnmatch.fnmatch(key, pattern):
-                        continue
-                    
-                    if value_type == 'text':
-                        value = value_blob.decode('utf-8')
-                    else:
-                        value = json.loads(value_blob.decode('utf-8'))
-                    
-                    yield key, value
+            with self._connect() as conn:
+                if pattern:
+                    cursor = conn.execute(
+                        f'SELECT key, value, value_type FROM {self._table} WHERE key GLOB ? ORDER BY key',
+                        (self._glob_pattern(pattern),)
+                    )
+                else:
+                    cursor = conn.execute(f'SELECT key, value, value_type FROM {self._table} ORDER BY key')
+                for key, value_blob, value_type in cursor:
+                    yield key, self._decode_value(value_blob, value_type)
         except Exception as e:
-            print(f"Error iterating items: {e}")
+            logger.error("Error iterating items: %s", e)
+    
+    def values_iter(self) -> Iterator[Any]:
+        """Iterate over all values without loading them all at once.
+        
+        Rows are streamed from the cursor in table order; use this instead
+        of items() when the keys are not needed.
+        """
+        try:
+            with self._connect() as conn:
+                cursor = conn.execute(f'SELECT value, value_type FROM {self._table}')
+                for value_blob, value_type in cursor:
+                    yield self._decode_value(value_blob, value_type)
+        except Exception as e:
+            logger.error("Error iterating values: %s", e)
     
     def clear(self) -> bool:
         """Clear all data."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute('DELETE FROM kv_store')
+            with self._connect() as conn:
+                conn.execute(f'DELETE FROM {self._table}')
                 if self.enable_fts:
-                    conn.execute('DELETE FROM kv_fts')
+                    # kv_fts is an external-content table; plain DELETE would
+                    # try to read the value_text column back from kv_store
+                    conn.execute(f"INSERT INTO {self._fts_table}({self._fts_table}) VALUES('delete-all')")
                 conn.commit()
                 # Ensure tables are properly initialized after clearing
                 self._init_db()
                 return True
         except Exception as e:
-            print(f"Error clearing data: {e}")
+            logger.error("Error clearing data: %s", e)
             # Try to reinitialize the database in case of schema issues
             try:
                 self._init_db()
                 return True
             except Exception as init_e:
-                print(f"Error reinitializing database after clear: {init_e}")
+                logger.error("Error reinitializing database after clear: %s", init_e)
                 return False
     
     def size(self) -> int:
         """Get the number of stored items."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute('SELECT COUNT(*) FROM kv_store')
+            with self._connect() as conn:
+                cursor = conn.execute(f'SELECT COUNT(*) FROM {self._table}')
                 return cursor.fetchone()[0]
         except Exception as e:
-            print(f"Error getting size: {e}")
+            logger.error("Error getting size: %s", e)
             return 0
     
     def close(self) -> None:
         """Close the storage backend."""
-        # SQLite connections are managed per-operation, so no persistent connection to close
+        # Connections are either per-operation or shared and owned by the
+        # caller that opened them, so there is nothing to close here
         pass
 
     def insert_file_version(self, version_id: str, file_path: str, content: str, hash: str, timestamp: str, size: int) -> bool:
         """Inserts a new file version into the file_versions table."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 conn.execute('''
                     INSERT INTO file_versions (version_id, file_path, content, hash, timestamp, size)
                     VALUES (?, ?, ?, ?, ?, ?)
@@ -276,13 +452,13 @@ class SQLiteStorage(StorageInterface):
                 conn.commit()
                 return True
         except Exception as e:
-            print(f"Error inserting file version {version_id} for {file_path}: {e}")
+            logger.error("Error inserting file version %s for %s: %s", version_id, file_path, e)
             return False
 
     def insert_file_diff(self, diff_id: str, file_path: str, previous_version_id: Optional[str], current_version_id: str, diff_content: str, diff_type: str, operation_type: str, operation_details: Optional[str], timestamp: str) -> bool:
         """Inserts a new file diff into the file_diffs table."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 conn.execute('''
                     INSERT INTO file_diffs (diff_id, file_path, previous_version_id, current_version_id, diff_content, diff_type, operation_type, operation_details, timestamp)
                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
@@ -290,15 +466,17 @@ class SQLiteStorage(StorageInterface):
                 conn.commit()
                 return True
         except Exception as e:
-            print(f"Error inserting file diff {diff_id} for {file_path}: {e}")
+            logger.error("Error inserting file diff %s for %s: %s", diff_id, file_path, e)
             return False
 
     def get_file_version(self, version_id: str) -> Optional[Dict]:
         """Retrieves a file version by its ID."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.execute('SELECT * FROM file_versions WHERE version_id = ?', (version_id,))
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                # On the cursor, not the connection, which other tables share
+                cursor.row_factory = sqlite3.Row
+                cursor.execute('SELECT * FROM file_versions WHERE version_id = ?', (version_id,))
                 row = cursor.fetchone()
                 if row:
                     version_data = dict(row)
@@ -306,15 +484,17 @@ class SQLiteStorage(StorageInterface):
                     return version_data
                 return None
         except Exception as e:
-            print(f"Error retrieving file version {version_id}: {e}")
+            logger.error("Error retrieving file version %s: %s", version_id, e)
             return None
 
     def get_file_diffs_for_path(self, file_path: str) -> List[Dict]:
         """Retrieves all diffs for a given file path."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.execute('SELECT * FROM file_diffs WHERE file_path = ? ORDER BY timestamp ASC', (file_path,))
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                # On the cursor, not the connection, which other tables share
+                cursor.row_factory = sqlite3.Row
+                cursor.execute('SELECT * FROM file_diffs WHERE file_path = ? ORDER BY timestamp ASC', (file_path,))
                 diffs = []
                 for row in cursor.fetchall():
                     diff_data = dict(row)
@@ -322,15 +502,17 @@ class SQLiteStorage(StorageInterface):
                     diffs.append(diff_data)
                 return diffs
         except Exception as e:
-            print(f"Error retrieving file diffs for {file_path}: {e}")
+            logger.error("Error retrieving file diffs for %s: %s", file_path, e)
             return []
 
     def get_file_versions_for_path(self, file_path: str) -> List[Dict]:
         """Retrieves all versions for a given file path, ordered by timestamp."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.execute('SELECT * FROM file_versions WHERE file_path = ? ORDER BY timestamp ASC', (file_path,))
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                # On the cursor, not the connection, which other tables share
+                cursor.row_factory = sqlite3.Row
+                cursor.execute('SELECT * FROM file_versions WHERE file_path = ? ORDER BY timestamp ASC', (file_path,))
                 versions = []
                 for row in cursor.fetchall():
                     version_data = dict(row)
@@ -338,7 +520,7 @@ class SQLiteStorage(StorageInterface):
                     versions.append(version_data)
                 return versions
         except Exception as e:
-            print(f"Error retrieving file versions for {file_path}: {e}")
+            logger.error("Error retrieving file versions for %s: %s", file_path, e)
             return []
     
     def flush(self) -> bool:
@@ -346,11 +528,37 @@ class SQLiteStorage(StorageInterface):
         # SQLite operations are immediately committed, so no buffering to flush
         return True
     
+    # Read-only mapping protocol, so the storage can be handed out as a lazy
+    # dict-like view instead of being copied into a dict
+    
+    def __getitem__(self, key: str) -> Any:
+        with self._connect() as conn:
+            row = conn.execute(
+                f'SELECT value, value_type FROM {self._table} WHERE key = ?',
+                (key,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return self._decode_value(*row)
+    
+    def __iter__(self) -> Iterator[str]:
+        return self.keys()
+    
+    def __len__(self) -> int:
+        return self.size()
+    
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self.exists(key)
+    
     def search(self, query: str) -> List[Tuple[str, Any]]:
         """Search using Full-Text Search (if enabled).
         
+        The MATCH is against the table name so the planner always uses the
+        FTS index. With the trigram tokenizer any search term of three or
+        more characters matches as a substring.
+        
         Args:
-            query: Search query
+            query: FTS5 query string
             
         Returns:
             List of (key, value) tuples matching the query
@@ -359,28 +567,47 @@ class SQLiteStorage(StorageInterface):
             raise NotImplementedError("FTS not enabled for this storage instance")
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute('''
-                    SELECT kv_store.key, kv_store.value, kv_store.value_type
-                    FROM kv_fts
-                    JOIN kv_store ON kv_fts.rowid = kv_store.rowid
-                    WHERE kv_fts MATCH ?
+            with self._connect() as conn:
+                cursor = conn.execute(f'''
+                    SELECT {self._table}.key, {self._table}.value, {self._table}.value_type
+                    FROM {self._fts_table}
+                    JOIN {self._table} ON {self._fts_table}.rowid = {self._table}.rowid
+                    WHERE {self._fts_table} MATCH ?
                     ORDER BY rank
                 ''', (query,))
                 
-                results = []
-                for row in cursor:
-                    key, value_blob, value_type = row
-                    if value_type == 'text':
-                        value = value_blob.decode('utf-8')
-                    else:
-                        value = json.loads(value_blob.decode('utf-8'))
-                    results.append((key, value))
-                
-                return results
+                return [(key, self._decode_value(value_blob, value_type))
+                        for key, value_blob, value_type in cursor]
         except Exception as e:
-            print(f"Error searching: {e}")
+            logger.error("Error searching: %s", e)
             return []
+    
+    def search_substring(self, text: str) -> List[Tuple[str, Any]]:
+        """Find entries whose key or text value contains text.
+        
+        Args:
+            text: Literal substring; FTS5 query syntax is not interpreted
+            
+        Returns:
+            List of (key, value) tuples containing the substring
+        """
+        if len(text) < 3 or not (self.enable_fts and FTS_TOKENIZE):
+            # Too short for a trigram, or no trigram index: scan instead
+            escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            try:
+                with self._connect() as conn:
+                    cursor = conn.execute(f'''
+                        SELECT key, value, value_type FROM {self._table}
+                        WHERE key LIKE ?1 ESCAPE '\\'
+                           OR (value_type = 'text' AND CAST(value AS TEXT) LIKE ?1 ESCAPE '\\')
+                    ''', (f"%{escaped}%",))
+                    return [(key, self._decode_value(value_blob, value_type))
+                            for key, value_blob, value_type in cursor]
+            except Exception as e:
+                logger.error("Error searching: %s", e)
+                return []
+        # A quoted phrase is matched literally by the trigram tokenizer
+        return self.search('"' + text.replace('"', '""') + '"')
 
 
 class SQLiteFileIndex(FileIndexInterface):
@@ -475,7 +702,7 @@ class SQLiteFileIndex(FileIndexInterface):
                 conn.commit()
                 return True
         except Exception as e:
-            print(f"Error adding file {file_path}: {e}")
+            logger.error("Error adding file %s: %s", file_path, e)
             return False
     
     def remove_file(self, file_path: str) -> bool:
@@ -486,7 +713,7 @@ class SQLiteFileIndex(FileIndexInterface):
                 conn.commit()
                 return cursor.rowcount > 0
         except Exception as e:
-            print(f"Error removing file {file_path}: {e}")
+            logger.error("Error removing file %s: %s", file_path, e)
             return False
     
     def get_file_info(self, file_path: str) -> Optional[Dict[str, Any]]:
@@ -512,7 +739,7 @@ class SQLiteFileIndex(FileIndexInterface):
                     **metadata
                 }
         except Exception as e:
-            print(f"Error getting file info for {file_path}: {e}")
+            logger.error("Error getting file info for %s: %s", file_path, e)
             return None
     
     def find_files_by_pattern(self, pattern: str) -> List[str]:
@@ -528,7 +755,7 @@ class SQLiteFileIndex(FileIndexInterface):
                 
                 return [row[0] for row in cursor.fetchall()]
         except Exception as e:
-            print(f"Error finding files by pattern {pattern}: {e}")
+            logger.error("Error finding files by pattern %s: %s", pattern, e)
             return []
     
     def find_files_by_extension(self, extension: str) -> List[str]:
@@ -541,7 +768,7 @@ class SQLiteFileIndex(FileIndexInterface):
                 )
                 return [row[0] for row in cursor.fetchall()]
         except Exception as e:
-            print(f"Error finding files by extension {extension}: {e}")
+            logger.error("Error finding files by extension %s: %s", extension, e)
             return []
     
     def get_directory_structure(self, directory_path: str = "") -> Dict[str, Any]:
@@ -591,7 +818,7 @@ class SQLiteFileIndex(FileIndexInterface):
                 
                 return structure
         except Exception as e:
-            print(f"Error getting directory structure: {e}")
+            logger.error("Error getting directory structure: %s", e)
             return {}
     
     def get_all_files(self) -> List[Tuple[str, Dict[str, Any]]]:
@@ -619,7 +846,7 @@ class SQLiteFileIndex(FileIndexInterface):
                 
                 return files
         except Exception as e:
-            print(f"Error getting all files: {e}")
+            logger.error("Error getting all files: %s", e)
             return []
     
     def clear(self) -> bool:
@@ -633,13 +860,13 @@ class SQLiteFileIndex(FileIndexInterface):
                 self._init_db()
                 return True
         except Exception as e:
-            print(f"Error clearing file index: {e}")
+            logger.error("Error clearing file index: %s", e)
             # Try to reinitialize the database in case of schema issues
             try:
                 self._init_db()
                 return True
             except Exception as init_e:
-                print(f"Error reinitializing file index after clear: {init_e}")
+                logger.error("Error reinitializing file index after clear: %s", init_e)
                 return False
     
     def size(self) -> int:
@@ -649,7 +876,7 @@ class SQLiteFileIndex(FileIndexInterface):
                 cursor = conn.execute('SELECT COUNT(*) FROM files')
                 return cursor.fetchone()[0]
         except Exception as e:
-            print(f"Error getting file index size: {e}")
+            logger.error("Error getting file index size: %s", e)
             return 0
     
     def close(self) -> None:
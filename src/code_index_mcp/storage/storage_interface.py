@@ -6,7 +6,7 @@ to ensure consistent API across different storage implementations.
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Any, Iterator, Tuple
+from typing import Dict, List, Optional, Any, Iterable, Iterator, Tuple
 
 
 class StorageInterface(ABC):
@@ -25,6 +25,22 @@ class StorageInterface(ABC):
         """
         pass
     
+    def put_many(self, items: Iterable[Tuple[str, Any]]) -> bool:
+        """Store many key-value pairs.
+        
+        Backends should override this to write all pairs in one batch.
+        
+        Args:
+            items: Iterable of (key, value) pairs to store
+            
+        Returns:
+            True if all pairs were stored, False otherwise
+        """
+        success = True
+        for key, value in items:
+            success = self.put(key, value) and success
+        return success
+    
     @abstractmethod
     def get(self, key: str) -> Optional[Any]:
         """Retrieve a value by key.
@@ -5,32 +5,98 @@ This module implements a file index using a Trie data structure for efficient
 storage and retrieval of file paths.
 """
 
-from typing import Any, Dict, Optional, List, Tuple
-from collections import defaultdict
+import json
+import struct
+from array import array
+from typing import Any, BinaryIO, Dict, Optional, List, Tuple
+from operator import itemgetter
 from .storage_interface import FileIndexInterface
 
 
-class TrieNode:
-    def __init__(self):
-        self.children = defaultdict(TrieNode)
-        self.is_end_of_word = False
-        self.file_info: Optional[Dict[str, Any]] = None
+# Serialized layout: header, then one fixed-size record per node in
+# breadth-first order (so every node's children are contiguous and sorted
+# by name), then the segment-name and file-info blobs. Identical names and
+# file-info payloads are stored once and shared by offset.
+TRIE_MAGIC = b'CIMT'
+TRIE_FORMAT_VERSION = 1
+_HEADER = struct.Struct('<4sBxxxIII')  # magic, version, node_count, names_offset, infos_offset
+_NODE = struct.Struct('<IIIHII')       # first_child, child_count, name_offset, name_length, info_offset, info_length
 
 
 class TrieFileIndex(FileIndexInterface):
-    """File index using Trie data structure."""
+    """File index using Trie data structure.
+    
+    Nodes live in parallel arrays indexed by node id (0 is the root) rather
+    than as one object per node: children form a doubly linked sibling list
+    for traversal, and a single (parent, name) -> child dict gives O(1)
+    descent. Terminal nodes carry their file info in _file_info.
+    """
     
     def __init__(self):
-        self.root = TrieNode()
+        self._reset()
+        # Serialized trie (bytes or mmap) that lookups read from directly
+        # until the first mutation; see from_buffer().
+        self._buf = None
+        self._names_offset = 0
+        self._infos_offset = 0
+
+    def _reset(self) -> None:
+        self._first_child = array('i', [-1])
+        self._next_sibling = array('i', [-1])
+        self._prev_sibling = array('i', [-1])
+        self._names: List[str] = ['']
+        self._children: Dict[Tuple[int, str], int] = {}
+        self._file_info: Dict[int, Dict[str, Any]] = {}
+        self._free: List[int] = []
+
+    def _new_node(self, parent: int, name: str) -> int:
+        if self._free:
+            node = self._free.pop()
+            self._first_child[node] = -1
+            self._names[node] = name
+        else:
+            node = len(self._names)
+            self._first_child.append(-1)
+            self._next_sibling.append(-1)
+            self._prev_sibling.append(-1)
+            self._names.append(name)
+        head = self._first_child[parent]
+        if head >= 0:
+            self._prev_sibling[head] = node
+        self._next_sibling[node] = head
+        self._prev_sibling[node] = -1
+        self._first_child[parent] = node
+        self._children[(parent, name)] = node
+        return node
+
+    def _unlink(self, parent: int, node: int) -> None:
+        del self._children[(parent, self._names[node])]
+        prev, next_ = self._prev_sibling[node], self._next_sibling[node]
+        if prev < 0:
+            self._first_child[parent] = next_
+        else:
+            self._next_sibling[prev] = next_
+        if next_ >= 0:
+            self._prev_sibling[next_] = prev
+        self._names[node] = ''
+        self._free.append(node)
+
+    def _iter_children(self, node: int):
+        child = self._first_child[node]
+        while child >= 0:
+            yield child
+            child = self._next_sibling[child]
 
     def add_file(self, file_path: str, file_type: str, extension: str, 
                  metadata: Optional[Dict[str, Any]] = None) -> bool:
-        current = self.root
-        parts = file_path.split('/')
-        for part in parts:
-            current = current.children[part]
-        current.is_end_of_word = True
-        current.file_info = {
+        if self._buf is not None:
+            self._materialize()
+        children = self._children
+        node = 0
+        for part in file_path.split('/'):
+            child = children.get((node, part))
+            node = self._new_node(node, part) if child is None else child
+        self._file_info[node] = {
             "type": file_type,
             "extension": extension,
             **(metadata or {})
@@ -38,58 +104,249 @@ class TrieFileIndex(FileIndexInterface):
         return True
 
     def remove_file(self, file_path: str) -> bool:
-        def _remove(node: TrieNode, parts: List[str], depth: int) -> bool:
-            if depth == len(parts):
-                if not node.is_end_of_word:
-                    return False  # File not found
-                node.is_end_of_word = False
-                return not node.children  # If no children, node can be deleted
-            part = parts[depth]
-            if part not in node.children:
+        if self._buf is not None:
+            self._materialize()
+        path_nodes = [0]
+        for part in file_path.split('/'):
+            child = self._children.get((path_nodes[-1], part))
+            if child is None:
                 return False  # File not found
-            can_delete = _remove(node.children[part], parts, depth + 1)
-            if can_delete:
-                del node.children[part]
-                return not node.children and not node.is_end_of_word
-            return False
-        return _remove(self.root, file_path.split('/'), 0)
+            path_nodes.append(child)
+        if self._file_info.pop(path_nodes[-1], None) is None:
+            return False  # File not found
+        # Prune nodes that no longer lead to any file
+        for depth in range(len(path_nodes) - 1, 0, -1):
+            node = path_nodes[depth]
+            if self._first_child[node] >= 0 or node in self._file_info:
+                break
+            self._unlink(path_nodes[depth - 1], node)
+        return True
 
     def get_file_info(self, file_path: str) -> Optional[Dict[str, Any]]:
-        current = self.root
-        parts = file_path.split('/')
-        for part in parts:
-            if part not in current.children:
+        if self._buf is not None:
+            return self._buffer_file_info(file_path)
+        children = self._children
+        node = 0
+        for part in file_path.split('/'):
+            node = children.get((node, part))
+            if node is None:
                 return None
-            current = current.children[part]
-        return current.file_info if current.is_end_of_word else None
+        return self._file_info.get(node)
 
     def find_files_by_pattern(self, pattern: str) -> List[str]:
         raise NotImplementedError("Pattern search not implemented in TrieFileIndex")
 
     def find_files_by_extension(self, extension: str) -> List[str]:
-        result = []
-        def _search(node: TrieNode, path: str):
-            if node.is_end_of_word and node.file_info and node.file_info['extension'] == extension:
-                result.append(path)
-            for part, child_node in node.children.items():
-                _search(child_node, f"{path}/{part}" if path else part)
-        _search(self.root, "")
-        return result
+        if self._buf is not None:
+            return [path for path, info in self._buffer_files() if info and info['extension'] == extension]
+        return [path for path, info in self._iter_files() if info['extension'] == extension]
 
     def get_directory_structure(self, directory_path: str = "") -> Dict[str, Any]:
         raise NotImplementedError("Directory structure retrieval not implemented in TrieFileIndex")
 
     def get_all_files(self) -> List[Tuple[str, Dict[str, Any]]]:
-        files = []
-        def _gather_files(node: TrieNode, path: str):
-            if node.is_end_of_word:
-                files.append((path, node.file_info))
-            for part, child_node in node.children.items():
-                _gather_files(child_node, f"{path}/{part}" if path else part)
-        _gather_files(self.root, "")
-        return files
+        if self._buf is not None:
+            return self._buffer_files()
+        return list(self._iter_files())
+
+    def _iter_files(self):
+        names = self._names
+        file_info = self._file_info
+        stack = [(0, "")]
+        while stack:
+            node, path = stack.pop()
+            if node in file_info:
+                yield path, file_info[node]
+            for child in self._iter_children(node):
+                # Join on the parent being the root, not on path being empty,
+                # so a leading empty segment ('/abs') keeps its slash
+                stack.append((child, f"{path}/{names[child]}" if node else names[child]))
     
     def clear(self) -> None:
         """Clear all files from the index."""
-        self.root = TrieNode()
+        self._reset()
+        self._buf = None
+
+    def serialize(self, f: BinaryIO) -> None:
+        """Write the index to a binary file in the flat trie format.
+        
+        File info is stored as JSON: tuples come back as lists, and values
+        JSON can't represent (datetime, sets, ...) raise TypeError.
+        """
+        if self._buf is not None:
+            f.write(self._buf)
+            return
+        names = self._names
+        file_info = self._file_info
+        nodes: List[Tuple[bytes, int]] = [(b'', 0)]
+        records = bytearray()
+        name_blob = bytearray()
+        name_offsets: Dict[bytes, int] = {}
+        infos = bytearray()
+        info_offsets: Dict[bytes, int] = {}
+        i = 0
+        while i < len(nodes):
+            name, node = nodes[i]
+            i += 1
+            first_child = len(nodes)
+            nodes.extend(sorted(
+                ((names[child].encode('utf-8', 'surrogateescape'), child)
+                 for child in self._iter_children(node)),
+                key=itemgetter(0)
+            ))
+
+            name_offset = name_offsets.get(name)
+            if name_offset is None:
+                name_offset = name_offsets[name] = len(name_blob)
+                name_blob += name
 
+            info = b''
+            info_offset = 0
+            if node in file_info:
+                info = json.dumps(file_info[node], separators=(',', ':')).encode('utf-8')
+                info_offset = info_offsets.get(info)
+                if info_offset is None:
+                    info_offset = info_offsets[info] = len(infos)
+                    infos += info
+
+            records += _NODE.pack(first_child, len(nodes) - first_child, name_offset, len(name),
+                                  info_offset, len(info))
+
+        names_offset = _HEADER.size + len(records)
+        f.write(_HEADER.pack(TRIE_MAGIC, TRIE_FORMAT_VERSION, len(nodes),
+                             names_offset, names_offset + len(name_blob)))
+        f.write(records)
+        f.write(name_blob)
+        f.write(infos)
+
+    @classmethod
+    def deserialize(cls, f: BinaryIO) -> 'TrieFileIndex':
+        """Read an index written by serialize()."""
+        index = cls.from_buffer(f.read())
+        index._materialize()
+        return index
+
+    @classmethod
+    def from_buffer(cls, buf) -> 'TrieFileIndex':
+        """Wrap a serialized index without parsing it.
+        
+        buf may be bytes or an mmap. Lookups walk the node records in place,
+        so only the pages a query touches are read; the first mutation
+        copies the trie into regular nodes.
+        """
+        magic, version, _, names_offset, infos_offset = _HEADER.unpack_from(buf, 0)
+        if magic != TRIE_MAGIC or version != TRIE_FORMAT_VERSION:
+            raise ValueError("Not a serialized TrieFileIndex")
+        index = cls()
+        index._buf = buf
+        index._names_offset = names_offset
+        index._infos_offset = infos_offset
+        return index
+
+    def _materialize(self) -> None:
+        """Rebuild the in-memory arrays from the serialized buffer.
+        
+        Serialized node ids are kept as-is: records are breadth-first with
+        contiguous children, which maps directly onto the sibling lists.
+        """
+        buf = self._buf
+        node_count = _HEADER.unpack_from(buf, 0)[2]
+        names_offset = self._names_offset
+        first_children = array('i', [-1]) * node_count
+        next_siblings = array('i', [-1]) * node_count
+        prev_siblings = array('i', [-1]) * node_count
+        parents = array('i', [0]) * node_count
+        names = [''] * node_count
+        # Equal names share one offset in the blob; decoding each one once
+        # also makes every node with that name share a single str object.
+        # The key includes the length because an empty name (from a leading
+        # or doubled '/') sits at the same offset as the next name stored.
+        offset_names: Dict[Tuple[int, int], str] = {}
+        children: Dict[Tuple[int, str], int] = {}
+        file_info: Dict[int, Dict[str, Any]] = {}
+        parsed_infos: Dict[int, Dict[str, Any]] = {}
+        with memoryview(buf) as view:
+            for node, (first_child, child_count, name_offset, name_length, info_offset, info_length) in enumerate(
+                    _NODE.iter_unpack(view[_HEADER.size:names_offset])):
+                if node:
+                    name = offset_names.get((name_offset, name_length))
+                    if name is None:
+                        start = names_offset + name_offset
+                        name = offset_names[(name_offset, name_length)] = buf[start:start + name_length].decode('utf-8', 'surrogateescape')
+                    names[node] = name
+                    children[(parents[node], name)] = node
+                if child_count:
+                    first_children[node] = first_child
+                    parents[first_child:first_child + child_count] = array('i', [node]) * child_count
+                    for child in range(first_child, first_child + child_count - 1):
+                        next_siblings[child] = child + 1
+                        prev_siblings[child + 1] = child
+                if info_length:
+                    info = parsed_infos.get(info_offset)
+                    if info is None:
+                        info = parsed_infos[info_offset] = self._buffer_info(info_offset, info_length)
+                    file_info[node] = dict(info)
+        self._first_child = first_children
+        self._next_sibling = next_siblings
+        self._prev_sibling = prev_siblings
+        self._names = names
+        self._children = children
+        self._file_info = file_info
+        self._free = []
+        self._buf = None
+
+    def _buffer_info(self, info_offset: int, info_length: int) -> Dict[str, Any]:
+        start = self._infos_offset + info_offset
+        return json.loads(self._buf[start:start + info_length])
+
+    def _buffer_child(self, node: int, name: bytes) -> int:
+        """Binary-search node's sorted children for name; -1 if absent."""
+        buf = self._buf
+        names_offset = self._names_offset
+        lo, hi = _NODE.unpack_from(buf, _HEADER.size + node * _NODE.size)[:2]
+        hi += lo
+        while lo < hi:
+            mid = (lo + hi) // 2
+            name_offset, name_length = _NODE.unpack_from(buf, _HEADER.size + mid * _NODE.size)[2:4]
+            start = names_offset + name_offset
+            mid_name = buf[start:start + name_length]
+            if mid_name < name:
+                lo = mid + 1
+            elif mid_name > name:
+                hi = mid
+            else:
+                return mid
+        return -1
+
+    def _buffer_file_info(self, file_path: str) -> Optional[Dict[str, Any]]:
+        node = 0
+        for part in file_path.split('/'):
+            node = self._buffer_child(node, part.encode('utf-8', 'surrogateescape'))
+            if node < 0:
+                return None
+        info_offset, info_length = _NODE.unpack_from(self._buf, _HEADER.size + node * _NODE.size)[4:]
+        return self._buffer_info(info_offset, info_length) if info_length else None
+
+    def _buffer_files(self) -> List[Tuple[str, Dict[str, Any]]]:
+        buf = self._buf
+        names_offset = self._names_offset
+        node_count = _HEADER.unpack_from(buf, 0)[2]
+        # Records are breadth-first, so a node's prefix is always known
+        # before its own record is reached.
+        prefixes = [''] * node_count
+        parsed_infos: Dict[int, Dict[str, Any]] = {}
+        files = []
+        with memoryview(buf) as view:
+            for i, (first_child, child_count, name_offset, name_length, info_offset, info_length) in enumerate(
+                    _NODE.iter_unpack(view[_HEADER.size:names_offset])):
+                start = names_offset + name_offset
+                path = prefixes[i] + buf[start:start + name_length].decode('utf-8', 'surrogateescape')
+                if child_count:
+                    prefix = f"{path}/" if i else ""
+                    prefixes[first_child:first_child + child_count] = [prefix] * child_count
+                if info_length:
+                    info = parsed_infos.get(info_offset)
+                    if info is None:
+                        info = parsed_infos[info_offset] = self._buffer_info(info_offset, info_length)
+                    files.append((path, dict(info)))
+        return files
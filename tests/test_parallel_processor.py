@@ -0,0 +1,34 @@
+import asyncio
+import concurrent.futures
+import threading
+
+from code_index_mcp.parallel_processor import IndexingResult, ParallelIndexer
+
+
+def test_cancel_all_tasks_without_progress_callback():
+    release = threading.Event()
+
+    def blocked(task):
+        release.wait(5)
+        return IndexingResult(task.task_id, [], [], 0.0, True)
+
+    async def run():
+        indexer = ParallelIndexer(max_workers=2, chunk_size=10,
+                                  executor_cls=concurrent.futures.ThreadPoolExecutor)
+        tasks = indexer.create_chunks([f'f{i}.py' for i in range(400)], '/')
+        job = asyncio.ensure_future(indexer.process_chunks_parallel(tasks, blocked))
+        await asyncio.sleep(0.05)
+        assert indexer.get_active_task_count() == len(tasks)
+
+        indexer.cancel_all_tasks()
+        release.set()
+        try:
+            await job
+        except asyncio.CancelledError:
+            pass
+        else:
+            raise AssertionError('batch was not cancelled')
+        assert indexer.get_active_task_count() == 0
+        indexer.shutdown()
+
+    asyncio.run(run())
@@ -0,0 +1,43 @@
+import threading
+
+from code_index_mcp.storage.sqlite_storage import SQLiteStorage, open_shared_connection
+
+
+def test_shared_connection_across_threads(tmp_path):
+    db_path = str(tmp_path / 'store.db')
+    shared = open_shared_connection(db_path)
+    cache = SQLiteStorage(db_path, enable_fts=True, table='cache_kv', connection=shared)
+    metadata = SQLiteStorage(db_path, enable_fts=False, table='metadata_kv', connection=shared)
+    errors = []
+
+    def worker(n):
+        try:
+            for i in range(50):
+                for storage in (cache, metadata):
+                    key = f'{n}:{i}'
+                    assert storage.put(key, {'n': n, 'i': i})
+                    assert storage.get(key) == {'n': n, 'i': i}
+                    assert key in list(storage.keys(f'{n}:*'))
+        except AssertionError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert cache.size() == metadata.size() == 6 * 50
+    shared.close()
+
+
+def test_version_rows_leave_shared_connection_tuples(tmp_path):
+    db_path = str(tmp_path / 'store.db')
+    shared = open_shared_connection(db_path)
+    storage = SQLiteStorage(db_path, enable_fts=False, table='metadata_kv', connection=shared)
+    storage.insert_file_version('v1', 'a.py', 'x = 1', 'h', '2020-01-01', 5)
+
+    assert storage.get_file_version('v1')['content'] == 'x = 1'
+    assert isinstance(shared.get().execute('SELECT 1').fetchone(), tuple)
+    shared.close()
@@ -0,0 +1,49 @@
+import datetime
+import io
+
+import pytest
+
+from code_index_mcp.storage.trie_index import TrieFileIndex
+
+
+def _round_trip(index: TrieFileIndex) -> TrieFileIndex:
+    buf = io.BytesIO()
+    index.serialize(buf)
+    buf.seek(0)
+    return TrieFileIndex.deserialize(buf)
+
+
+def test_round_trip_keeps_empty_path_segments():
+    paths = ['src/a.py', '/abs/x.txt', 'dir//y.py']
+    index = TrieFileIndex()
+    for path in paths:
+        index.add_file(path, 'file', path.rsplit('.', 1)[-1])
+
+    loaded = _round_trip(index)
+
+    assert sorted(path for path, _ in loaded.get_all_files()) == sorted(paths)
+    for path in paths:
+        assert loaded.get_file_info(path) == index.get_file_info(path)
+
+
+def test_buffer_lookups_keep_empty_path_segments():
+    paths = ['src/a.py', '/abs/x.txt', 'dir//y.py']
+    index = TrieFileIndex()
+    for path in paths:
+        index.add_file(path, 'file', 'py')
+    buf = io.BytesIO()
+    index.serialize(buf)
+
+    loaded = TrieFileIndex.from_buffer(buf.getvalue())
+
+    assert sorted(path for path, _ in loaded.get_all_files()) == sorted(paths)
+    for path in paths:
+        assert loaded.get_file_info(path) is not None
+
+
+def test_serialize_rejects_non_json_file_info():
+    index = TrieFileIndex()
+    index.add_file('src/a.py', 'file', '.py', {'modified': datetime.datetime(2020, 1, 1)})
+
+    with pytest.raises(TypeError):
+        index.serialize(io.BytesIO())